@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Audio Statistics
+Single-pass signal quality checks for received audio
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+from numba import njit
+
+class AudioStats(NamedTuple):
+    """Signal statistics computed by audio_qc"""
+    min: float
+    max: float
+    mean: float
+    rms: float
+    std: float
+    abs_max: float
+    zero_crossings: int
+    has_nan_inf: bool
+
+# fastmath without the no-NaN/no-Inf flags, so the NaN/Inf check survives
+_FASTMATH_FLAGS = {'reassoc', 'contract', 'arcp', 'nsz'}
+
+@njit(cache=True, fastmath=_FASTMATH_FLAGS)
+def _audio_qc(x):
+    n = x.shape[0]
+    total = 0.0
+    total_sq = 0.0
+    lo = np.inf
+    hi = -np.inf
+    zero_crossings = 0
+    has_nan_inf = False
+    prev_negative = x[0] < 0.0
+
+    for i in range(n):
+        v = np.float64(x[i])
+        if v != v or v == np.inf or v == -np.inf:
+            has_nan_inf = True
+        total += v
+        total_sq += v * v
+        if v < lo:
+            lo = v
+        if v > hi:
+            hi = v
+        negative = v < 0.0
+        if negative != prev_negative:
+            zero_crossings += 1
+        prev_negative = negative
+
+    mean = total / n
+    variance = max(total_sq / n - mean * mean, 0.0)
+    return lo, hi, mean, np.sqrt(total_sq / n), np.sqrt(variance), zero_crossings, has_nan_inf
+
+def audio_qc(audio: np.ndarray) -> AudioStats:
+    """Compute min/max/mean/RMS/std, zero crossings and a NaN/Inf flag in one pass"""
+    samples = np.ascontiguousarray(audio, dtype=np.float32)
+    if samples.size == 0:
+        return AudioStats(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0, False)
+
+    lo, hi, mean, rms, std, zero_crossings, has_nan_inf = _audio_qc(samples)
+    return AudioStats(lo, hi, mean, rms, std, max(abs(lo), abs(hi)), zero_crossings, has_nan_inf)
+
+@njit(cache=True, fastmath=_FASTMATH_FLAGS)
+def _sum_squares(x):
+    total = 0.0
+    for i in range(x.shape[0]):
+        v = np.float64(x[i])
+        total += v * v
+    return total
+
+def pcm_rms(audio: np.ndarray) -> float:
+    """RMS of raw samples in their own units, without a float copy"""
+    samples = np.ascontiguousarray(audio).ravel()
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(_sum_squares(samples) / samples.size))
+
+@njit(cache=True, fastmath=_FASTMATH_FLAGS)
+def _scale_q15(x, gain_q15, out):
+    for i in range(x.shape[0]):
+        v = (np.int32(x[i]) * gain_q15) >> 15
+        if v > 32767:
+            v = 32767
+        elif v < -32768:
+            v = -32768
+        out[i] = np.int16(v)
+
+def scale_q15(audio: np.ndarray, gain_q15: int, out: np.ndarray = None) -> np.ndarray:
+    """Scale int16 audio by a Q15 fixed-point gain with clipping in a single pass"""
+    samples = np.ascontiguousarray(audio, dtype=np.int16)
+    if out is None:
+        out = np.empty(samples.shape[0], dtype=np.int16)
+    _scale_q15(samples, np.int32(gain_q15), out)
+    return out
+
+@njit(cache=True, fastmath=_FASTMATH_FLAGS)
+def _offset_and_scale(x, offset, gain):
+    for i in range(x.shape[0]):
+        v = (x[i] - offset) * gain
+        if v > 1.0:
+            v = 1.0
+        elif v < -1.0:
+            v = -1.0
+        x[i] = v
+
+def offset_and_scale(audio: np.ndarray, offset: float, gain: float) -> np.ndarray:
+    """Subtract offset and multiply by gain in place, saturating to [-1, 1], in a single pass"""
+    _offset_and_scale(audio, np.float32(offset), np.float32(gain))
+    return audio
+
+@njit(cache=True)
+def _distinct_values_upto(x, cap, seen):
+    count = 0
+    for i in range(x.shape[0]):
+        v = x[i]
+        found = False
+        for j in range(count):
+            if seen[j] == v:
+                found = True
+                break
+        if not found:
+            seen[count] = v
+            count += 1
+            if count > cap:
+                break
+    return count
+
+def distinct_values_upto(audio: np.ndarray, cap: int) -> np.ndarray:
+    """Return the sorted distinct values of audio, stopping once more than cap are seen"""
+    samples = np.ascontiguousarray(audio).ravel()
+    seen = np.empty(cap + 1, dtype=samples.dtype)
+    count = _distinct_values_upto(samples, cap, seen)
+    return np.sort(seen[:count])
+
+def warm_up() -> None:
+    """Compile every kernel for the dtypes the server passes, so the first turn doesn't pay for JIT"""
+    pcm = np.zeros(16, dtype=np.int16)
+    samples = np.zeros(16, dtype=np.float32)
+    for audio in (pcm, samples):
+        pcm_rms(audio)
+        distinct_values_upto(audio, 10)
+    audio_qc(samples)
+    offset_and_scale(samples, 0.0, 1.0)
+    scale_q15(pcm, 1 << 15)
@@ -5,19 +5,31 @@ Contains logging configuration and application configuration
 """
 
 from .logging_config import get_logger, setup_logger, set_log_level, get_log_config, print_log_config
-from .app_config import (
-    app_config,
-    AI_MODEL_CONFIG,
-    STT_CONFIG,
-    TTS_CONFIG,
-    AUDIO_CONFIG,
-    VAD_CONFIG,
-    WEBRTC_CONFIG,
-    SERVER_CONFIG,
-    DEBUG_CONFIG,
-    PERFORMANCE_CONFIG
+from . import app_config as _app_config_module
+
+# Importing the submodule binds it as a package attribute; drop that binding so
+# `config.app_config` resolves to the configuration instance via __getattr__
+globals().pop("app_config", None)
+
+_LAZY_CONFIG_NAMES = (
+    'app_config',
+    'AI_MODEL_CONFIG',
+    'STT_CONFIG',
+    'TTS_CONFIG',
+    'AUDIO_CONFIG',
+    'VAD_CONFIG',
+    'WEBRTC_CONFIG',
+    'SERVER_CONFIG',
+    'DEBUG_CONFIG',
+    'PERFORMANCE_CONFIG',
 )
 
+def __getattr__(name):
+    """Resolve configuration objects lazily so importing the package stays cheap"""
+    if name in _LAZY_CONFIG_NAMES:
+        return getattr(_app_config_module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 __all__ = [
     # Logging
     'get_logger', 
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Configuration summary helpers
+Kept out of app_config so normal startup doesn't load the reporting code
+"""
+
+from types import MappingProxyType
+from typing import Any, Mapping
+
+def build_config_summary(config) -> Mapping[str, Mapping[str, Any]]:
+    """Build a read-only summary of an AppConfig instance"""
+    summary = {
+        "ai_model": {
+            "provider": config.ai_model.provider,
+            "deepseek_configured": bool(config.ai_model.deepseek_api_key),
+            "qwen_configured": bool(config.ai_model.qwen_plus_api_key),
+            "history_max_turns": config.ai_model.history_max_turns,
+        },
+        "stt": {
+            "provider": config.stt.model_provider,
+            "model": config.stt.sensevoice_model if config.stt.model_provider == "sensevoice" else config.stt.whisper_model,
+            "language": config.stt.language,
+            "num_threads": config.stt.num_threads,
+        },
+        "tts": {
+            "provider": config.tts.provider,
+            "voice": config.tts.voice,
+            "rate": config.tts.rate,
+            "volume": config.tts.volume,
+            "cache_size": config.tts.cache_size,
+        },
+        "audio": {
+            "sample_rate": config.audio.sample_rate,
+            "channels": config.audio.channels,
+            "chunk_duration": config.audio.chunk_duration,
+        },
+        "vad": {
+            "threshold": config.vad.threshold,
+            "min_speech_duration": config.vad.min_speech_duration,
+            "silence_duration": config.vad.silence_duration,
+        },
+        "webrtc": {
+            "stun_server": config.webrtc.stun_server,
+            "concurrency_limit": config.webrtc.concurrency_limit,
+            "time_limit": config.webrtc.time_limit,
+        },
+        "server": {
+            "host": config.server.host,
+            "port": config.server.port,
+            "cors_origins": config.server.cors_origins,
+        },
+        "debug": {
+            "audio_debug": config.debug.audio,
+            "audio_path": config.debug.audio_path,
+        },
+        "performance": {
+            "max_audio_duration": config.performance.max_audio_duration,
+            "min_audio_duration": config.performance.min_audio_duration,
+            "ai_response_timeout": config.performance.ai_response_timeout,
+            "tts_timeout": config.performance.tts_timeout,
+        }
+    }
+    return MappingProxyType({
+        section: MappingProxyType(values) for section, values in summary.items()
+    })
+
+def format_config_summary(config) -> str:
+    """Render the configuration summary as printable text"""
+    lines = []
+    lines.append("🔧 VoiceAgent Configuration Summary")
+    lines.append("=" * 50)
+    
+    lines.append(f"📡 AI Model: {config.ai_model.provider}")
+    if config.ai_model.provider == "deepseek":
+        status = "✅ Configured" if config.ai_model.deepseek_api_key else "❌ Missing API Key"
+        lines.append(f"   DeepSeek: {status}")
+    elif config.ai_model.provider == "qwen-plus":
+        status = "✅ Configured" if config.ai_model.qwen_plus_api_key else "❌ Missing API Key"
+        lines.append(f"   Qwen-Plus: {status}")
+    lines.append(f"   History: {config.ai_model.history_max_turns} turns")
+    
+    lines.append(f"🎤 STT Model: {config.stt.model_provider}")
+    if config.stt.model_provider == "sensevoice":
+        lines.append(f"   SenseVoice Model: {config.stt.sensevoice_model}")
+    else:
+        lines.append(f"   Whisper Model: {config.stt.whisper_model}")
+    lines.append(f"   Language: {config.stt.language}")
+    lines.append(f"   Threads: {config.stt.num_threads}")
+    
+    lines.append(f"🔊 TTS Provider: {config.tts.provider}")
+    lines.append(f"   Voice: {config.tts.voice}")
+    lines.append(f"   Rate: {config.tts.rate} WPM")
+    lines.append(f"   Volume: {config.tts.volume}")
+    lines.append(f"   Cache: {config.tts.cache_size} utterances")
+    
+    lines.append(f"🎵 Audio: {config.audio.sample_rate}Hz, {config.audio.channels}ch")
+    lines.append(f"🎯 VAD: threshold={config.vad.threshold}, silence={config.vad.silence_duration}ms")
+    lines.append(f"🌐 Server: {config.server.host}:{config.server.port}")
+    lines.append(f"📝 Debug Audio: {'Enabled' if config.debug.audio else 'Disabled'}")
+    lines.append("=" * 50)
+    return "\n".join(lines)
\ No newline at end of file
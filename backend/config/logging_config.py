@@ -5,13 +5,16 @@ Manages logging levels, formats and output methods for the entire application
 """
 
 import os
+import atexit
 import logging
-import logging.handlers
+import queue
 from datetime import datetime
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Optional
 
 DEFAULT_LOG_LEVEL = "INFO"
 LOG_LEVEL = os.getenv("LOG_LEVEL", DEFAULT_LOG_LEVEL).upper()
+_LEVEL_NUM = getattr(logging, LOG_LEVEL, logging.INFO)
 
 LOG_FORMATS = {
     "DETAILED": "%(asctime)s | %(name)s | %(levelname)8s | %(message)s",
@@ -21,13 +24,22 @@ LOG_FORMATS = {
 
 CURRENT_FORMAT = os.getenv("LOG_FORMAT", "SIMPLE")
 
-LOG_OUTPUT = {
-    "CONSOLE": True,
-    "FILE": os.getenv("LOG_TO_FILE", "false").lower() == "true",
-    "FILE_PATH": os.getenv("LOG_FILE_PATH", "logs/voiceagent.log"),
-    "MAX_FILE_SIZE": int(os.getenv("LOG_MAX_FILE_SIZE", "10")) * 1024 * 1024,
-    "BACKUP_COUNT": int(os.getenv("LOG_BACKUP_COUNT", "5")),
-}
+@lru_cache(maxsize=1)
+def _output() -> Dict[str, Any]:
+    """Build the log output settings on first use"""
+    return {
+        "CONSOLE": True,
+        "FILE": os.getenv("LOG_TO_FILE", "false").lower() == "true",
+        "FILE_PATH": os.getenv("LOG_FILE_PATH", "logs/voiceagent.log"),
+        "MAX_FILE_SIZE": int(os.getenv("LOG_MAX_FILE_SIZE", "10")) * 1024 * 1024,
+        "BACKUP_COUNT": int(os.getenv("LOG_BACKUP_COUNT", "5")),
+    }
+
+def __getattr__(name: str):
+    """Expose LOG_OUTPUT lazily (PEP 562)"""
+    if name == "LOG_OUTPUT":
+        return _output()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class ColoredFormatter(logging.Formatter):
     """Colored log formatter"""
@@ -41,11 +53,92 @@ class ColoredFormatter(logging.Formatter):
         'RESET': '\033[0m'
     }
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        reset = self.COLORS['RESET']
+        self._colored = {
+            level: f"{color}{level}{reset}"
+            for level, color in self.COLORS.items() if level != 'RESET'
+        }
+    
     def format(self, record):
-        if record.levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[record.levelname]}{record.levelname}{self.COLORS['RESET']}"
+        levelname = record.levelname
+        colored = self._colored.get(levelname)
+        if colored is None:
+            return super().format(record)
+        
+        # Restore the plain level name so other handlers don't see the color codes
+        record.levelname = colored
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+
+# Formatters shared by every handler created in setup_logger
+_FMT_STR = LOG_FORMATS.get(CURRENT_FORMAT, LOG_FORMATS["SIMPLE"])
+_CONSOLE_FMT = ColoredFormatter(_FMT_STR)
+_FILE_FMT = logging.Formatter(_FMT_STR)
+
+# Loggers already configured by setup_logger, keyed by name
+_loggers: Dict[str, logging.Logger] = {}
+
+# Queue handler shared by every logger, created on first use
+_queue_handler = None
+
+def _shared_queue_handler() -> Optional[logging.Handler]:
+    """Return the queue handler feeding the single listener thread, starting it on first use"""
+    global _queue_handler
+    if _queue_handler is not None:
+        return _queue_handler
+    
+    output = _output()
+    handlers = []
+    
+    if output["CONSOLE"]:
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(_LEVEL_NUM)
+        console_handler.setFormatter(_CONSOLE_FMT)
+        handlers.append(console_handler)
+    
+    if output["FILE"]:
+        from logging.handlers import RotatingFileHandler
+        
+        log_dir = os.path.dirname(output["FILE_PATH"])
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir, exist_ok=True)
+        
+        file_handler = RotatingFileHandler(
+            output["FILE_PATH"],
+            maxBytes=output["MAX_FILE_SIZE"],
+            backupCount=output["BACKUP_COUNT"],
+            encoding='utf-8'
+        )
+        file_handler.setLevel(_LEVEL_NUM)
+        file_handler.setFormatter(_FILE_FMT)
+        handlers.append(file_handler)
+    
+    if not handlers:
+        return None
+    
+    from logging.handlers import QueueHandler, QueueListener
+    
+    class DeferredFormatQueueHandler(QueueHandler):
+        """QueueHandler that leaves all formatting to the handlers on the listener thread"""
         
-        return super().format(record)
+        def prepare(self, record):
+            # The stock prepare() formats the message on the caller's thread; here the
+            # record is queued as-is. Arguments are interpolated later, so a mutable
+            # argument changed right after the log call may show its newer value
+            return record
+    
+    # Callers only enqueue records; message interpolation, formatting and
+    # stream/file writes all happen on one listener thread for all loggers
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    _queue_handler = DeferredFormatQueueHandler(log_queue)
+    return _queue_handler
 
 def setup_logger(name: str = "voiceagent") -> logging.Logger:
     """
@@ -57,39 +150,22 @@ def setup_logger(name: str = "voiceagent") -> logging.Logger:
     Returns:
         Configured logger instance
     """
+    logger = _loggers.get(name)
+    if logger is not None:
+        return logger
+    
     logger = logging.getLogger(name)
     
     if logger.handlers:
+        _loggers[name] = logger
         return logger
     
-    log_level = getattr(logging, LOG_LEVEL)
-    logger.setLevel(log_level)
-    
-    if LOG_OUTPUT["CONSOLE"]:
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(log_level)
-        
-        console_formatter = ColoredFormatter(LOG_FORMATS[CURRENT_FORMAT])
-        console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
-    
-    if LOG_OUTPUT["FILE"]:
-        log_dir = os.path.dirname(LOG_OUTPUT["FILE_PATH"])
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir, exist_ok=True)
-        
-        file_handler = logging.handlers.RotatingFileHandler(
-            LOG_OUTPUT["FILE_PATH"],
-            maxBytes=LOG_OUTPUT["MAX_FILE_SIZE"],
-            backupCount=LOG_OUTPUT["BACKUP_COUNT"],
-            encoding='utf-8'
-        )
-        file_handler.setLevel(log_level)
-        
-        file_formatter = logging.Formatter(LOG_FORMATS[CURRENT_FORMAT])
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+    logger.setLevel(_LEVEL_NUM)
+    queue_handler = _shared_queue_handler()
+    if queue_handler is not None:
+        logger.addHandler(queue_handler)
     
+    _loggers[name] = logger
     return logger
 
 def get_logger(name: str = "voiceagent") -> logging.Logger:
@@ -98,18 +174,20 @@ def get_logger(name: str = "voiceagent") -> logging.Logger:
 
 def set_log_level(level: str):
     """Dynamically set log level"""
-    global LOG_LEVEL
+    global LOG_LEVEL, _LEVEL_NUM
     LOG_LEVEL = level.upper()
-    for logger_name in logging.Logger.manager.loggerDict:
-        logger = logging.getLogger(logger_name)
-        logger.setLevel(getattr(logging, level.upper()))
+    _LEVEL_NUM = getattr(logging, LOG_LEVEL)
+    for logger in logging.Logger.manager.loggerDict.values():
+        # Skip PlaceHolder entries created for dotted names without a logger
+        if isinstance(logger, logging.Logger):
+            logger.setLevel(_LEVEL_NUM)
 
 def get_log_config() -> Dict[str, Any]:
     """Get current logging configuration"""
     return {
         "level": LOG_LEVEL,
         "format": CURRENT_FORMAT,
-        "output": LOG_OUTPUT,
+        "output": _output(),
     }
 
 def print_log_config():
@@ -6,13 +6,18 @@ Supports multiple AI models and configurable speech recognition
 """
 
 import os
+import re
+import asyncio
+import logging
 import tempfile
-import wave
 import subprocess
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
 import numpy as np
-import requests
-import json
+import soundfile as sf
+from scipy.signal import resample_poly
 from datetime import datetime
 from dotenv import load_dotenv
 from fastapi import FastAPI
@@ -22,7 +27,6 @@ from fastrtc import (
     ReplyOnPause, Stream, AlgoOptions, SileroVadOptions,
     audio_to_bytes, aggregate_bytes_to_16bit
 )
-from openai import OpenAI
 from models import ModelManager
 from config import (
     get_logger, print_log_config, app_config, 
@@ -30,6 +34,7 @@ from config import (
     VAD_CONFIG, DEBUG_CONFIG, PERFORMANCE_CONFIG
 )
 from stt.stt_manager import STTManager
+from audio_stats import audio_qc, distinct_values_upto, offset_and_scale, pcm_rms, warm_up as warm_up_audio_kernels
 from tts.tts_manager import TTSManager
 
 logger = get_logger()
@@ -79,6 +84,14 @@ def init_managers():
         logger.error(f"❌ TTS manager initialization failed: {e}")
         success = False
     
+    # Compile the audio kernels now rather than on the first user turn
+    try:
+        warm_up_start = time.time()
+        warm_up_audio_kernels()
+        logger.info(f"✅ Audio kernels ready in {time.time() - warm_up_start:.2f}s")
+    except Exception as e:
+        logger.warning(f"⚠️ Audio kernel warm-up failed: {e}")
+    
     # Initialize AI model manager
     try:
         model_manager = ModelManager()
@@ -108,338 +121,487 @@ def create_tts_audio(text):
         logger.error(f"❌ TTS generation failed: {e}")
         return None
 
-def response_handler(audio: tuple[int, np.ndarray]):
-    """Process audio input and generate response"""
+# Sentences are synthesized in the background, at most this many at a time,
+# while the LLM keeps streaming
+TTS_CONCURRENCY = 3
+tts_executor = ThreadPoolExecutor(max_workers=TTS_CONCURRENCY, thread_name_prefix="tts")
+
+# Text is sent to TTS up to the last sentence end, up to the last clause end once
+# enough characters have accumulated, or whole when the buffer grows past a hard cap.
+# Greedy prefixes so one match finds the last boundary; ASCII marks must be followed
+# by whitespace (or the end of the buffer) so "3.14" isn't split, CJK marks need not.
+SENTENCE_END_PATTERN = re.compile(r'.*(?:[.?!](?=\s|$)|[。？！])', re.DOTALL)
+CLAUSE_END_PATTERN = re.compile(r'.*(?:[,;](?=\s|$)|[，；])', re.DOTALL)
+# Counted in characters rather than words, since CJK text has no spaces
+MIN_CLAUSE_CHARS = 10
+MAX_TTS_BUFFER_LENGTH = 160
+
+# Substrings that mark a transcription as STT noise rather than real speech
+BAD_TRANSCRIPTION_REASONS = {
+    **{
+        bad_str: f"Contains error string: {bad_str}"
+        for bad_str in ("subtitle by someone", "subtitle by")
+    },
+    **{
+        pattern: f"Detected SenseVoice hallucination pattern: {pattern}"
+        for pattern in (
+            "Thank you.", "thanks", "Thank you for watching",
+            "please like subscribe and share", "thanks for watching",
+            "subtitle", "captions"
+        )
+    },
+}
+# Longest first so the most specific pattern is reported
+BAD_TRANSCRIPTION_PATTERN = re.compile('|'.join(
+    re.escape(pattern) for pattern in sorted(BAD_TRANSCRIPTION_REASONS, key=len, reverse=True)
+))
+
+# str.isalpha for every BMP code point, so counting letters is one table lookup
+BMP_ALPHA_TABLE = np.array([chr(code).isalpha() for code in range(0x10000)], dtype=bool)
+
+def text_quality_counts(text):
+    """Count '!', distinct and total non-space characters, and letters in one vectorized pass"""
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    exclamation_count = int(np.count_nonzero(codes == 0x21))
+    visible = codes[(codes != 0x20) & (codes != 0x0A)]
+    unique_chars = int(np.unique(visible).size)
+    
+    in_bmp = codes < 0x10000
+    alpha_count = int(np.count_nonzero(BMP_ALPHA_TABLE[codes[in_bmp]]))
+    if not in_bmp.all():
+        alpha_count += sum(chr(code).isalpha() for code in codes[~in_bmp])
+    return exclamation_count, unique_chars, int(visible.size), alpha_count
+
+def tts_flush_point(text_buffer):
+    """Return how many leading characters of buffered LLM text to flush to TTS, 0 to keep buffering"""
+    sentence_match = SENTENCE_END_PATTERN.match(text_buffer)
+    flush_at = sentence_match.end() if sentence_match else 0
+    
+    clause_match = CLAUSE_END_PATTERN.match(text_buffer)
+    if clause_match and clause_match.end() > flush_at and clause_match.end() >= MIN_CLAUSE_CHARS:
+        flush_at = clause_match.end()
+    
+    if not flush_at and len(text_buffer) > MAX_TTS_BUFFER_LENGTH:
+        flush_at = len(text_buffer)
+    return flush_at
+
+def downsample_by_two(audio_data):
+    """Halve the sample rate with an anti-aliased polyphase filter, keeping the dtype"""
+    resampled = resample_poly(audio_data.astype(np.float32), 1, 2)
+    if np.issubdtype(audio_data.dtype, np.integer):
+        limits = np.iinfo(audio_data.dtype)
+        resampled = np.clip(np.rint(resampled), limits.min, limits.max)
+    return resampled.astype(audio_data.dtype)
+
+# Debug dumps are written off the request path, one file at a time
+debug_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="debug-audio")
+
+def save_debug_audio(debug_filename, audio_float, sample_rate):
+    """Write the STT input as a 16-bit FLAC file"""
     try:
-        total_start_time = time.time()
-        
-        sample_rate, audio_data = audio
-        logger.info(f"🎤🎤🎤 FastRTC received audio: sample rate={sample_rate}Hz, shape={audio_data.shape}")
+        os.makedirs(os.path.dirname(debug_filename), exist_ok=True)
+        # libsndfile converts the float samples to 16-bit PCM while encoding
+        sf.write(debug_filename, audio_float, sample_rate, format='FLAC', subtype='PCM_16')
+        logger.info(f"💾 Debug audio saved: {debug_filename} ({sample_rate}Hz)")
+    except Exception as e:
+        logger.error(f"❌ Failed to save debug audio {debug_filename}: {e}")
+
+# (min_samples, max_samples) accepted per sample rate, filled on first use
+SAMPLE_LIMITS = {}
+
+def sample_limits(sample_rate):
+    """Return the minimum and maximum accepted sample counts at sample_rate"""
+    limits = SAMPLE_LIMITS.get(sample_rate)
+    if limits is None:
+        limits = SAMPLE_LIMITS[sample_rate] = (
+            int(PERFORMANCE_CONFIG.min_audio_duration * sample_rate),
+            int(PERFORMANCE_CONFIG.max_audio_duration * sample_rate),
+        )
+    return limits
+
+# Full-scale integer PCM to [-1, 1) float; powers of two, so the scaling is exact
+INT16_TO_FLOAT = np.float32(1.0 / 32768.0)
+INT32_TO_FLOAT = np.float32(1.0 / 2147483648.0)
+
+# Per-thread work buffer reused by transcribe_audio across turns
+_scratch = threading.local()
+
+def get_scratch_buffer(num_samples):
+    """Return a float32 view of num_samples from this thread's reusable buffer"""
+    scratch = _scratch
+    f32 = getattr(scratch, 'f32', None)
+    if f32 is None or f32.size < num_samples:
+        scratch.f32 = np.empty(num_samples, dtype=np.float32)
+    return scratch.f32[:num_samples]
+
+def timed_tts_audio(text):
+    """Generate TTS audio and report how long synthesis took"""
+    tts_start_time = time.time()
+    tts_result = create_tts_audio(text)
+    return tts_result, time.time() - tts_start_time
+
+def transcribe_audio(audio: tuple[int, np.ndarray]):
+    """Condition received audio and transcribe it, returning (transcription, STT time) or None"""
+    sample_rate, audio_data = audio
+    logger.info(f"🎤🎤🎤 FastRTC received audio: sample rate={sample_rate}Hz, shape={audio_data.shape}")
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug(f"📊 Audio data statistics: min={np.min(audio_data)}, max={np.max(audio_data)}, mean={np.mean(audio_data):.4f}")
         logger.debug(f"📊 Audio data type: {audio_data.dtype}")
-        
-        if len(audio_data) == 0:
-            logger.error("❌ Received empty audio data")
-            return
-        
-        original_shape = audio_data.shape
-        if audio_data.ndim > 1:
-            if audio_data.shape[0] == 1:
-                audio_data = audio_data[0]
-            else:
-                audio_data = audio_data.flatten()
-        
-        duration = len(audio_data) / sample_rate
-        logger.info(f"⏱️ Audio duration: {duration:.2f} seconds (original shape: {original_shape} -> processed length: {len(audio_data)})")
-        
-        unique_values = np.unique(audio_data)
-        logger.debug(f"🔍 Number of unique values: {len(unique_values)}")
-        if len(unique_values) <= 10:
-            logger.warning(f"⚠️ Warning: Audio values change very little, first 10 unique values: {unique_values[:10]}")
-        
-        processed_sample_rate = sample_rate
-        if sample_rate == 48000:
-            logger.info("🔧 Executing sample rate conversion: 48kHz -> 24kHz")
-            audio_data = audio_data[::2]
-            processed_sample_rate = 24000
-            duration = len(audio_data) / processed_sample_rate
-            logger.info(f"🔧 Conversion completed: length={len(audio_data)}, duration={duration:.2f} seconds")
-        
-        rms = np.sqrt(np.mean(audio_data.astype(np.float32) ** 2))
-        print(f"🔊 Audio RMS energy (int16): {rms:.2f}")
-        
-        if rms < 100:
-            print(f"⚠️ Low audio energy (RMS: {rms:.2f}), possibly environmental sound or silence")
-        elif rms > 5000:
-            print(f"🔊 High audio energy (RMS: {rms:.2f}), possibly loud speech")
+    
+    if len(audio_data) == 0:
+        logger.error("❌ Received empty audio data")
+        return None
+    
+    original_shape = audio_data.shape
+    if audio_data.ndim > 1:
+        if audio_data.shape[0] == 1:
+            audio_data = audio_data[0]
         else:
-            print(f"✅ Normal audio energy (RMS: {rms:.2f})")
-            
-        if duration < PERFORMANCE_CONFIG.min_audio_duration:
-            print(f"⚠️ Short audio ({duration:.2f} seconds), skipping processing")
-            return
-        
-        if audio_data.dtype == np.int16:
-            audio_float = audio_data.astype(np.float32) / 32768.0
-        elif audio_data.dtype == np.int32:
-            audio_float = audio_data.astype(np.float32) / 2147483648.0
+            audio_data = audio_data.flatten()
+    
+    duration = len(audio_data) / sample_rate
+    logger.info(f"⏱️ Audio duration: {duration:.2f} seconds (original shape: {original_shape} -> processed length: {len(audio_data)})")
+    
+    # Cheap length gates first, so short chunks return before any pass over the samples
+    if duration < PERFORMANCE_CONFIG.min_audio_duration:
+        logger.warning(f"⚠️ Short audio ({duration:.2f} seconds), skipping processing")
+        return None
+    
+    raw_max_samples = sample_limits(sample_rate)[1]
+    if len(audio_data) > raw_max_samples:
+        logger.warning(f"⚠️ Long audio, truncating to {PERFORMANCE_CONFIG.max_audio_duration} seconds: {len(audio_data)} -> {raw_max_samples} samples")
+        audio_data = audio_data[:raw_max_samples]
+    
+    # Stops scanning once more than 10 distinct values are seen
+    unique_values = distinct_values_upto(audio_data, 10)
+    logger.debug(f"🔍 Number of unique values: {len(unique_values) if len(unique_values) <= 10 else 'more than 10'}")
+    if len(unique_values) <= 10:
+        logger.warning(f"⚠️ Warning: Audio values change very little, first 10 unique values: {unique_values[:10]}")
+    
+    processed_sample_rate = sample_rate
+    if sample_rate == 48000:
+        logger.info("🔧 Executing sample rate conversion: 48kHz -> 24kHz")
+        audio_data = downsample_by_two(audio_data)
+        processed_sample_rate = 24000
+        duration = len(audio_data) / processed_sample_rate
+        logger.info(f"🔧 Conversion completed: length={len(audio_data)}, duration={duration:.2f} seconds")
+    
+    rms = pcm_rms(audio_data)
+    logger.debug(f"🔊 Audio RMS energy (int16): {rms:.2f}")
+    
+    if rms < 100:
+        logger.warning(f"⚠️ Low audio energy (RMS: {rms:.2f}), possibly environmental sound or silence")
+    elif rms > 5000:
+        logger.debug(f"🔊 High audio energy (RMS: {rms:.2f}), possibly loud speech")
+    else:
+        logger.debug(f"✅ Normal audio energy (RMS: {rms:.2f})")
+    
+    num_samples = len(audio_data)
+    if num_samples == 0:
+        logger.error("❌ Converted float32 data is empty")
+        return None
+    
+    min_samples, max_samples = sample_limits(processed_sample_rate)
+    if num_samples < min_samples:
+        logger.error(f"❌ Short audio: {num_samples} < {min_samples} samples")
+        return None
+    
+    if num_samples > max_samples:
+        logger.warning(f"⚠️ Long audio, truncating to {PERFORMANCE_CONFIG.max_audio_duration} seconds: {num_samples} -> {max_samples} samples")
+        num_samples = max_samples
+    
+    # Only the kept samples are converted, straight into this thread's buffers
+    audio_float = get_scratch_buffer(num_samples)
+    if audio_data.dtype == np.int16:
+        np.multiply(audio_data[:num_samples], INT16_TO_FLOAT, out=audio_float, dtype=np.float32, casting='unsafe')
+    elif audio_data.dtype == np.int32:
+        np.multiply(audio_data[:num_samples], INT32_TO_FLOAT, out=audio_float, dtype=np.float32, casting='unsafe')
+    else:
+        # Float input is saturated like the integer paths, which can't exceed full scale
+        np.clip(audio_data[:num_samples], -1.0, 1.0, out=audio_float, casting='unsafe')
+    
+    # Single pass over the samples; the checks below scale these stats
+    # by the applied gain instead of re-reading the audio
+    stats = audio_qc(audio_float)
+    
+    if stats.has_nan_inf:
+        logger.error("❌ float32 data contains NaN or infinite values")
+        return None
+    
+    logger.debug(f"🔄 Converted audio range: [{stats.min:.6f}, {stats.max:.6f}]")
+    
+    rms_float = stats.rms
+    logger.debug(f"🔊 Audio RMS energy (float32): {rms_float:.6f}")
+    
+    gain = 1.0
+    if rms_float < 0.001:
+        logger.warning("⚠️ Warning: Low audio energy, possibly silence or problematic audio")
+        if rms_float > 0:
+            logger.debug("🔧 Trying to enhance low energy audio...")
+            enhancement_factor = 0.01 / rms_float
+            gain = min(enhancement_factor, 50)
+            rms_float = rms_float * gain
+            logger.debug(f"🔧 Enhanced audio RMS: {rms_float:.6f}")
         else:
-            audio_float = audio_data.astype(np.float32)
-            
-        print(f"🔄 Converted audio range: [{np.min(audio_float):.6f}, {np.max(audio_float):.6f}]")
+            logger.error("❌ Audio completely silent, skipping processing")
+            return None
+    
+    max_amplitude = stats.abs_max * gain
+    if max_amplitude > 0 and max_amplitude < 0.01:
+        logger.debug(f"🔧 Low audio amplitude ({max_amplitude:.6f}), normalizing")
+        gain = gain * 0.1 / max_amplitude
+    
+    audio_std = stats.std * gain
+    audio_variance = audio_std ** 2
+    # Counted by audio_qc in the same pass as the other stats; gain doesn't change signs
+    zero_crossings = stats.zero_crossings
+    zero_crossing_rate = zero_crossings / num_samples
+    
+    logger.debug(
+        f"🔍 Audio signal analysis: variance={audio_variance:.8f}, std={audio_std:.8f}, "
+        f"zero crossings={zero_crossings}, zero crossing rate={zero_crossing_rate:.6f}"
+    )
+    
+    if audio_std < 1e-6:
+        logger.error("❌ Flat audio signal, possibly constant or DC signal")
+        return None
+    
+    offset = 0.0
+    if zero_crossing_rate < 1e-4:
+        logger.warning("⚠️ Low zero crossing rate, possible DC offset, trying high-pass filter")
+        offset = stats.mean
+    dc_offset = offset * gain
+    
+    # Gain and DC removal are decided from the QC stats and applied together in one
+    # pass, saturating at full scale as the STT models expect
+    if gain != 1.0 or offset:
+        offset_and_scale(audio_float, offset, gain)
+    
+    if DEBUG_CONFIG.audio:
+        debug_filename = f"{DEBUG_CONFIG.audio_path}/received_{datetime.now().strftime('%H%M%S')}.flac"
+        # The scratch buffer is reused next turn, so the writer gets its own copy
+        debug_executor.submit(save_debug_audio, debug_filename, audio_float.copy(), processed_sample_rate)
+    
+    input_min = max(stats.min * gain - dc_offset, -1.0)
+    input_max = min(stats.max * gain - dc_offset, 1.0)
+    logger.info("Starting STT transcription...")
+    logger.debug(f"🎯 Input data to STT: length={len(audio_float)}, sample rate={processed_sample_rate}Hz")
+    logger.debug(f"🎯 Audio data range: [{input_min:.6f}, {input_max:.6f}]")
+    logger.debug(f"🎯 Maximum amplitude: {max(abs(input_min), abs(input_max)):.6f}")
+    
+    stt_start_time = time.time()
+    
+    try:
+        global stt_manager
+        if not stt_manager or not stt_manager.is_loaded():
+            logger.error("❌ STT manager not available")
+            return None
         
-        rms_float = np.sqrt(np.mean(audio_float ** 2))
-        print(f"🔊 Audio RMS energy (float32): {rms_float:.6f}")
+        logger.info(f"🔄 Starting {stt_manager.model_provider} transcription...")
         
-        if rms_float < 0.001:
-            print("⚠️ Warning: Low audio energy, possibly silence or problematic audio")
-            if rms_float > 0:
-                print("🔧 Trying to enhance low energy audio...")
-                enhancement_factor = 0.01 / rms_float
-                enhancement_factor = min(enhancement_factor, 50)
-                audio_float = audio_float * enhancement_factor
-                rms_float = np.sqrt(np.mean(audio_float ** 2))
-                print(f"🔧 Enhanced audio RMS: {rms_float:.6f}")
-            else:
-                print("❌ Audio completely silent, skipping processing")
-                return
+        # Float audio goes straight to the STT manager, which converts only if its backend needs int16
+        result = stt_manager.transcribe(audio_float, processed_sample_rate)
         
-        if DEBUG_CONFIG.audio:
-            debug_filename = f"{DEBUG_CONFIG.audio_path}/received_{datetime.now().strftime('%H%M%S')}.wav"
-            os.makedirs(os.path.dirname(debug_filename), exist_ok=True)
-            
-            debug_audio_int16 = (audio_float * 32768.0).clip(-32768, 32767).astype(np.int16)
-            
-            with wave.open(debug_filename, 'wb') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(processed_sample_rate)
-                wav_file.writeframes(debug_audio_int16.tobytes())
-            
-            print(f"💾 Debug audio saved: {debug_filename} ({processed_sample_rate}Hz)")
-            print(f"💾 Debug audio statistics: min={np.min(debug_audio_int16)}, max={np.max(debug_audio_int16)}")
+        stt_duration = time.time() - stt_start_time
+        logger.info(f"✅ STT transcription completed, time: {stt_duration:.2f} seconds")
+        logger.debug(f"🎯 STT recognition result: {result['text']}")
             
-            float_debug_filename = debug_filename.replace('.wav', '_stt_input.npy')
-            np.save(float_debug_filename, audio_float)
-            print(f"💾 STT input data saved: {float_debug_filename}")
+    except Exception as e:
+        stt_duration = time.time() - stt_start_time
+        logger.exception(f"❌ STT transcription failed: {e}, time: {stt_duration:.2f} seconds")
+        return None
+    
+    transcription = result["text"].strip()
+    
+    logger.debug(f"🎯 STT detected language: {result.get('language', 'unknown')}")
+    logger.debug(f"🎯 STT no speech probability: {result.get('no_speech_prob', 0):.4f}")
+    
+    if not transcription or result.get('no_speech_prob', 0) > 0.9:
+        logger.warning(f"⚠️ Poor transcription quality or no speech content, skipping processing (no speech probability: {result.get('no_speech_prob', 0):.3f})")
+        return None
+    
+    return transcription, stt_duration
+
+async def response_handler(audio: tuple[int, np.ndarray]):
+    """Process audio input and generate response"""
+    try:
+        total_start_time = time.time()
         
-        if len(audio_float) == 0:
-            print("❌ Converted float32 data is empty")
+        # Audio conditioning and STT block, so they run on a worker thread
+        transcribed = await asyncio.to_thread(transcribe_audio, audio)
+        if transcribed is None:
             return
+        transcription, stt_duration = transcribed
         
-        if np.any(np.isnan(audio_float)) or np.any(np.isinf(audio_float)):
-            print("❌ float32 data contains NaN or infinite values")
-            return
+        exclamation_count, unique_chars, total_chars, alpha_count = text_quality_counts(transcription)
+        exclamation_density = exclamation_count / len(transcription) if len(transcription) > 0 else 0
+        repeat_density = 1 - (unique_chars / total_chars) if total_chars > 0 else 0
         
-        min_samples = int(PERFORMANCE_CONFIG.min_audio_duration * processed_sample_rate)
-        if len(audio_float) < min_samples:
-            print(f"❌ Short audio: {len(audio_float)} < {min_samples} samples")
-            return
+        logger.debug(
+            f"🔍 Text quality check: length={len(transcription)}, "
+            f"exclamation marks={exclamation_count} (density {exclamation_density:.3f}), "
+            f"unique characters={unique_chars} (repeat density {repeat_density:.3f})"
+        )
         
-        max_samples = int(PERFORMANCE_CONFIG.max_audio_duration * processed_sample_rate)
-        if len(audio_float) > max_samples:
-            print(f"⚠️ Long audio, truncating to {PERFORMANCE_CONFIG.max_audio_duration} seconds: {len(audio_float)} -> {max_samples} samples")
-            audio_float = audio_float[:max_samples]
+        is_bad_pattern = False
+        bad_reason = ""
         
-        max_amplitude = np.max(np.abs(audio_float))
-        if max_amplitude > 0 and max_amplitude < 0.01:
-            print(f"🔧 Low audio amplitude ({max_amplitude:.6f}), normalizing")
-            audio_float = audio_float / max_amplitude * 0.1
-            
-        audio_variance = np.var(audio_float)
-        audio_std = np.std(audio_float)
-        zero_crossings = np.sum(np.diff(np.signbit(audio_float)))
+        if exclamation_count > 20 or exclamation_density > 0.3:
+            is_bad_pattern = True
+            bad_reason = f"Exclamation marks too many: {exclamation_count} marks, density {exclamation_density:.3f}"
         
-        print(f"🔍 Audio signal analysis:")
-        print(f"    Variance: {audio_variance:.8f}")
-        print(f"    Standard deviation: {audio_std:.8f}")  
-        print(f"    Zero crossings: {zero_crossings}")
-        print(f"    Zero crossing rate: {zero_crossings/len(audio_float):.6f}")
+        if repeat_density > 0.8 and total_chars > 10:
+            is_bad_pattern = True
+            bad_reason = f"High repeat character density: {repeat_density:.3f}"
         
-        if audio_std < 1e-6:
-            print("❌ Flat audio signal, possibly constant or DC signal")
-            return
-            
-        zero_crossing_rate = zero_crossings / len(audio_float)
-        if zero_crossing_rate < 1e-4:
-            print("⚠️ Low zero crossing rate, possible DC offset, trying high-pass filter")
-            audio_float = audio_float - np.mean(audio_float)
+        if len(transcription) > 200:
+            if "I love you" in transcription or "love you" in transcription:
+                is_bad_pattern = True
+                bad_reason = "Long text contains repeated love expression"
         
-        print("Starting STT transcription...")
-        print(f"🎯 Input data to STT: length={len(audio_float)}, sample rate={processed_sample_rate}Hz")
-        print(f"🎯 Audio data range: [{np.min(audio_float):.6f}, {np.max(audio_float):.6f}]")
-        print(f"🎯 Maximum amplitude: {np.max(np.abs(audio_float)):.6f}")
+        if alpha_count < len(transcription) * 0.3:
+            is_bad_pattern = True
+            bad_reason = f"Low effective character ratio: {alpha_count}/{len(transcription)}"
         
-        stt_start_time = time.time()
+        # One scan over the text for every known bad string and hallucination
+        bad_match = BAD_TRANSCRIPTION_PATTERN.search(transcription)
+        if bad_match:
+            is_bad_pattern = True
+            bad_reason = BAD_TRANSCRIPTION_REASONS[bad_match.group(0)]
         
-        try:
-            global stt_manager
-            if not stt_manager or not stt_manager.is_loaded():
-                print("❌ STT manager not available")
-                return
-            
-            print(f"🔄 Starting {stt_manager.model_provider} transcription...")
-            
-            # Convert float audio to int16 for STT processing
-            audio_int16 = (audio_float * 32768.0).clip(-32768, 32767).astype(np.int16)
-            
-            # Use STT manager for transcription
-            result = stt_manager.transcribe(audio_int16, processed_sample_rate)
-            
-            stt_duration = time.time() - stt_start_time
-            print(f"✅ STT transcription completed, time: {stt_duration:.2f} seconds")
-            print(f"🎯 STT recognition result: {result['text']}")
-                
-        except Exception as e:
-            stt_duration = time.time() - stt_start_time
-            print(f"❌ STT transcription failed: {e}, time: {stt_duration:.2f} seconds")
-            import traceback
-            print(f"Error details: {traceback.format_exc()}")
+        if is_bad_pattern:
+            logger.warning(f"⚠️ Discarding incorrect recognition ({bad_reason}): {transcription[:100]}...")
             return
         
-        transcription = result["text"].strip()
+        logger.info(f"✅ Transcription result: {transcription}")
         
-        print(f"🎯 STT detected language: {result.get('language', 'unknown')}")
-        print(f"🎯 STT no speech probability: {result.get('no_speech_prob', 0):.4f}")
+        current_provider = model_manager.get_current_provider()
+        logger.info(f"🤖 Starting AI stream API call (model: {current_provider})...")
         
-        if not transcription or result.get('no_speech_prob', 0) > 0.9:
-            print(f"⚠️ Poor transcription quality or no speech content, skipping processing (no speech probability: {result.get('no_speech_prob', 0):.3f})")
-            return
+        ai_api_start_time = time.time()
         
-        if transcription:
-            exclamation_count = transcription.count('!')
-            exclamation_density = exclamation_count / len(transcription) if len(transcription) > 0 else 0
-            
-            unique_chars = len(set(transcription.replace(' ', '').replace('\n', '')))
-            total_chars = len(transcription.replace(' ', '').replace('\n', ''))
-            repeat_density = 1 - (unique_chars / total_chars) if total_chars > 0 else 0
-            
-            print(f"🔍 Text quality check:")
-            print(f"    Length: {len(transcription)}")
-            print(f"    Exclamation mark count: {exclamation_count}, density: {exclamation_density:.3f}")
-            print(f"    Number of unique characters: {unique_chars}, repeat density: {repeat_density:.3f}")
-            
-            is_bad_pattern = False
-            bad_reason = ""
-            
-            bad_strings = ["subtitle by someone", "subtitle by", "subtitle"]
-            for bad_str in bad_strings:
-                if bad_str in transcription:
-                    is_bad_pattern = True
-                    bad_reason = f"Contains error string: {bad_str}"
-                    break
-            
-            if exclamation_count > 20 or exclamation_density > 0.3:
-                is_bad_pattern = True
-                bad_reason = f"Exclamation marks too many: {exclamation_count} marks, density {exclamation_density:.3f}"
-            
-            if repeat_density > 0.8 and total_chars > 10:
-                is_bad_pattern = True
-                bad_reason = f"High repeat character density: {repeat_density:.3f}"
-            
-            if len(transcription) > 200:
-                if "I love you" in transcription or "love you" in transcription:
-                    is_bad_pattern = True
-                    bad_reason = "Long text contains repeated love expression"
-            
-            clean_text = ''.join(c for c in transcription if c.isalpha())
-            if len(clean_text) < len(transcription) * 0.3:
-                is_bad_pattern = True
-                bad_reason = f"Low effective character ratio: {len(clean_text)}/{len(transcription)}"
-            
-            hallucination_patterns = [
-                "Thank you.", "thanks", "Thank you for watching",
-                "please like subscribe and share", "thanks for watching", 
-                "subtitle", "subtitle", "captions"
-            ]
-            for pattern in hallucination_patterns:
-                if pattern in transcription:
-                    is_bad_pattern = True
-                    bad_reason = f"Detected SenseVoice hallucination pattern: {pattern}"
-                    break
-            
-            if is_bad_pattern:
-                print(f"⚠️ Discarding incorrect recognition ({bad_reason}): {transcription[:100]}...")
-                return
-            
-            print(f"✅ Transcription result: {transcription}")
-            
-            current_provider = model_manager.get_current_provider()
-            print(f"�� Starting AI stream API call (model: {current_provider})...")
-            
-            ai_api_start_time = time.time()
-            
-            first_token_received_time = None
-            first_tts_start_time = None
-            first_audio_ready_time = None
-            
-            text_buffer = ""
-            min_tts_length = 3
-            
+        first_token_received_time = None
+        first_tts_start_time = None
+        first_audio_ready_time = None
+        
+        loop = asyncio.get_running_loop()
+        # Synthesis futures in reply order, ended by None. A slot is taken before
+        # each job is submitted and freed once its audio is ready, so at most
+        # TTS_CONCURRENCY sentences are in flight.
+        tts_queue = asyncio.Queue()
+        tts_slots = asyncio.Semaphore(TTS_CONCURRENCY)
+        
+        async def submit_tts(text):
+            """Start synthesizing text once a slot is free and queue its future"""
+            await tts_slots.acquire()
+            await tts_queue.put(loop.run_in_executor(tts_executor, timed_tts_audio, text))
+        
+        async def pipe_llm_to_tts():
+            """Read the LLM stream and queue synthesis of each sentence"""
+            nonlocal first_token_received_time, first_tts_start_time
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
             try:
-                for text_chunk in model_manager.call_ai_api_stream(transcription):
-                    if first_token_received_time is None:
-                        first_token_received_time = time.time()
-                        time_to_first_token = first_token_received_time - total_start_time
-                        print(f"🎯 [Key Metric] From start to first token: {time_to_first_token:.3f} seconds")
-                    
-                    print(f"🔄 Received text fragment: {repr(text_chunk)}")
-                    text_buffer += text_chunk
-                    
-                    if len(text_buffer.strip()) >= min_tts_length:
-                        if first_tts_start_time is None:
-                            first_tts_start_time = time.time()
-                            time_to_first_tts = first_tts_start_time - total_start_time
-                            print(f"🎯 [Key Metric] From start to first TTS: {time_to_first_tts:.3f} seconds")
-                        
-                        tts_start_time = time.time()
+                text_buffer = ""
+                # The stream waits on the network inside the event loop, not on a worker thread
+                async with aclosing(model_manager.call_ai_api_stream_async(transcription)) as llm_stream:
+                    async for text_chunk in llm_stream:
+                        if first_token_received_time is None:
+                            first_token_received_time = time.time()
+                            time_to_first_token = first_token_received_time - total_start_time
+                            logger.info(f"🎯 [Key Metric] From start to first token: {time_to_first_token:.3f} seconds")
                         
-                        print(f"🔊 Streaming TTS generation: {text_buffer.strip()[:30]}...")
-                        tts_result = create_tts_audio(text_buffer.strip())
+                        if debug_enabled:
+                            logger.debug("🔄 Received text fragment: %r", text_chunk)
+                        text_buffer += text_chunk
                         
-                        if tts_result:
-                            tts_duration = time.time() - tts_start_time
+                        flush_at = tts_flush_point(text_buffer)
+                        if not flush_at:
+                            continue
+                        # Text after the boundary stays buffered for the next sentence
+                        sentence = text_buffer[:flush_at].strip()
+                        text_buffer = text_buffer[flush_at:]
+                        if sentence:
+                            if first_tts_start_time is None:
+                                first_tts_start_time = time.time()
+                                time_to_first_tts = first_tts_start_time - total_start_time
+                                logger.info(f"🎯 [Key Metric] From start to first TTS: {time_to_first_tts:.3f} seconds")
                             
-                            if first_audio_ready_time is None:
-                                first_audio_ready_time = time.time()
-                                time_to_first_audio = first_audio_ready_time - total_start_time
-                                print(f"🎯 [User starts hearing sound]: {time_to_first_audio:.3f} seconds ⭐")
-                                print(f"🔊 First TTS time: {tts_duration:.3f} seconds")
-                            
-                            print(f"⚡ Streaming TTS completed, time: {tts_duration:.2f} seconds")
-                            yield tts_result
-                        
-                        text_buffer = ""
+                            logger.debug(f"🔊 Streaming TTS generation: {sentence[:30]}...")
+                            await submit_tts(sentence)
                 
                 if text_buffer.strip():
-                    print(f"🔊 Processing remaining text: {text_buffer.strip()[:30]}...")
-                    tts_start_time = time.time()
-                    tts_result = create_tts_audio(text_buffer.strip())
-                    
-                    if tts_result:
-                        tts_duration = time.time() - tts_start_time
-                        print(f"⚡ Final TTS completed, time: {tts_duration:.2f} seconds")
-                        yield tts_result
-                
-                total_duration = time.time() - total_start_time
-                ai_api_duration = time.time() - ai_api_start_time
+                    logger.debug(f"🔊 Processing remaining text: {text_buffer.strip()[:30]}...")
+                    await submit_tts(text_buffer.strip())
+            finally:
+                # Always end the reply; the consumer re-raises failures by awaiting this task
+                if not asyncio.current_task().cancelling():
+                    await tts_queue.put(None)
+        
+        producer = asyncio.create_task(pipe_llm_to_tts())
+        try:
+            while (pending := await tts_queue.get()) is not None:
+                tts_result, tts_duration = await pending
+                tts_slots.release()
+                if not tts_result:
+                    continue
                 
-                print("="*80)
-                print("🎯 [Performance Statistics Report]")
-                print("="*80)
-                print(f"⏱️  Total processing time: {total_duration:.3f} seconds")
-                print(f"🎤 STT(SenseVoice) time: {stt_duration:.3f} seconds")
-                print(f"🤖 AI streaming time: {ai_api_duration:.3f} seconds")
-                print(f"⚡ Other processing time: {(total_duration - stt_duration - ai_api_duration):.3f} seconds")
-                print("-"*80)
-                print("🎯 [Key User Experience Metrics]")
-                if first_token_received_time:
-                    time_to_first_token = first_token_received_time - total_start_time
-                    print(f"📥 First token arrived: {time_to_first_token:.3f} seconds")
-                if first_tts_start_time:
-                    time_to_first_tts = first_tts_start_time - total_start_time
-                    print(f"🔊 First TTS started: {time_to_first_tts:.3f} seconds")
-                if first_audio_ready_time:
+                if first_audio_ready_time is None:
+                    first_audio_ready_time = time.time()
                     time_to_first_audio = first_audio_ready_time - total_start_time
-                    print(f"🎵 [User starts hearing sound]: {time_to_first_audio:.3f} seconds ⭐⭐⭐")
-                    if first_token_received_time and first_tts_start_time:
-                        token_to_tts = first_tts_start_time - first_token_received_time
-                        tts_processing = first_audio_ready_time - first_tts_start_time
-                        print(f"   └─ Analysis: STT({stt_duration:.3f}s) + first token({time_to_first_token - stt_duration:.3f}s) + accumulation({token_to_tts:.3f}s) + TTS({tts_processing:.3f}s)")
-                print("="*80)
+                    logger.info(f"🎯 [User starts hearing sound]: {time_to_first_audio:.3f} seconds ⭐")
+                    logger.debug(f"🔊 First TTS time: {tts_duration:.3f} seconds")
                 
-            except Exception as e:
-                print(f"❌ Streaming processing failed: {e}")
-                error_audio = create_tts_audio("Sorry, there was an issue processing your request.")
-                if error_audio:
-                    yield error_audio
-        else:
-            print("No valid speech detected")
+                logger.debug(f"⚡ Streaming TTS completed, time: {tts_duration:.2f} seconds")
+                # The LLM keeps streaming into the queue while this audio is sent
+                yield tts_result
+            
+            await producer
+            
+            total_duration = time.time() - total_start_time
+            ai_api_duration = time.time() - ai_api_start_time
+            
+            report = [
+                "="*80,
+                "🎯 [Performance Statistics Report]",
+                "="*80,
+                f"⏱️  Total processing time: {total_duration:.3f} seconds",
+                f"🎤 STT(SenseVoice) time: {stt_duration:.3f} seconds",
+                f"🤖 AI streaming time: {ai_api_duration:.3f} seconds",
+                f"⚡ Other processing time: {(total_duration - stt_duration - ai_api_duration):.3f} seconds",
+                "-"*80,
+                "🎯 [Key User Experience Metrics]",
+            ]
+            if first_token_received_time:
+                time_to_first_token = first_token_received_time - total_start_time
+                report.append(f"📥 First token arrived: {time_to_first_token:.3f} seconds")
+            if first_tts_start_time:
+                time_to_first_tts = first_tts_start_time - total_start_time
+                report.append(f"🔊 First TTS started: {time_to_first_tts:.3f} seconds")
+            if first_audio_ready_time:
+                time_to_first_audio = first_audio_ready_time - total_start_time
+                report.append(f"🎵 [User starts hearing sound]: {time_to_first_audio:.3f} seconds ⭐⭐⭐")
+                if first_token_received_time and first_tts_start_time:
+                    token_to_tts = first_tts_start_time - first_token_received_time
+                    tts_processing = first_audio_ready_time - first_tts_start_time
+                    report.append(f"   └─ Analysis: STT({stt_duration:.3f}s) + first token({time_to_first_token - stt_duration:.3f}s) + accumulation({token_to_tts:.3f}s) + TTS({tts_processing:.3f}s)")
+            report.append("="*80)
+            logger.info("\n".join(report))
+            
+        except Exception as e:
+            logger.error(f"❌ Streaming processing failed: {e}")
+            error_audio = await loop.run_in_executor(tts_executor, create_tts_audio, "Sorry, there was an issue processing your request.")
+            if error_audio:
+                yield error_audio
+        finally:
+            # Stop the LLM reader and drop queued synthesis if the reply was interrupted or failed
+            producer.cancel()
+            while not tts_queue.empty():
+                pending = tts_queue.get_nowait()
+                if pending is not None:
+                    pending.cancel()
             
     except Exception as e:
-        print(f"Audio processing failed: {e}")
-        import traceback
-        print(f"Error details: {traceback.format_exc()}")
+        logger.exception(f"Audio processing failed: {e}")
 
 print("Creating FastRTC Stream...")
 stream = Stream(
@@ -0,0 +1,28 @@
+"""
+Shared HTTP Connection Pool
+HTTP/2 clients reused by every model instance in the process
+"""
+
+import httpx
+
+# Concurrent replies are multiplexed as streams over a few keep-alive
+# connections; failed connection attempts are retried by the transport
+CLIENT = httpx.Client(
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=8, keepalive_expiry=600),
+    ),
+    timeout=httpx.Timeout(15.0, connect=3.0),
+)
+
+# Same pool settings for the async streaming path; connections bind to the
+# event loop that first uses them, which is the server's single loop
+ASYNC_CLIENT = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=8, keepalive_expiry=600),
+    ),
+    timeout=httpx.Timeout(15.0, connect=3.0),
+)
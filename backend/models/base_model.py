@@ -4,14 +4,21 @@ Defines interfaces that all AI models must implement
 """
 
 from abc import ABC, abstractmethod
-from typing import Generator
+from typing import AsyncGenerator, Generator
+
+from config import AI_MODEL_CONFIG
 
 class BaseAIModel(ABC):
     """AI Model Base Class"""
     
     def __init__(self, model_name: str):
         self.model_name = model_name
-        self.conversation_history = []
+        self._cached_system_prompt = None
+        # The system prompt followed by the conversation, kept ready to send as-is
+        self._system_msg = {"role": "system", "content": self.get_system_prompt()}
+        self._messages = [self._system_msg]
+        # A turn is one user message and one assistant reply
+        self._max_history_messages = AI_MODEL_CONFIG.history_max_turns * 2
     
     @abstractmethod
     def is_configured(self) -> bool:
@@ -28,13 +35,48 @@ class BaseAIModel(ABC):
         """Call API to get streaming response"""
         pass
     
+    @abstractmethod
+    def call_api_stream_async(self, user_message: str) -> AsyncGenerator[str, None]:
+        """Call API to get streaming response without blocking a thread"""
+        pass
+    
     def add_to_history(self, role: str, content: str):
         """Add message to conversation history"""
-        self.conversation_history.append({"role": role, "content": content})
+        self._messages.append({"role": role, "content": content})
+        
+        # Evict the oldest messages but never the system prompt at index 0
+        excess = len(self._messages) - 1 - self._max_history_messages
+        if excess > 0:
+            del self._messages[1:1 + excess]
+    
+    def get_conversation_history(self) -> list:
+        """Get a copy of the conversation history"""
+        return self._messages[1:]
+    
+    def get_messages(self) -> list:
+        """
+        Get the system prompt and history as a request-ready message list
         
-        if len(self.conversation_history) > 20:
-            self.conversation_history = self.conversation_history[-20:]
+        This is the live list, not a copy; serialize it before the next add_to_history
+        """
+        return self._messages
+    
+    def refresh_system_prompt(self):
+        """Rebuild the cached system message after the system prompt changes"""
+        self._cached_system_prompt = None
+        self._system_msg = {"role": "system", "content": self.get_system_prompt()}
+        self._messages[0] = self._system_msg
+    
+    def clear_history(self):
+        """Clear conversation history"""
+        del self._messages[1:]
     
     def get_system_prompt(self) -> str:
-        """Get system prompt"""
+        """Get system prompt, computed on first use"""
+        if self._cached_system_prompt is None:
+            self._cached_system_prompt = self._compute_system_prompt()
+        return self._cached_system_prompt
+    
+    def _compute_system_prompt(self) -> str:
+        """Build the system prompt; override to customize it"""
         return "You are a friendly and intelligent AI assistant. Please answer user questions in concise, natural language. Keep responses suitable for voice conversation, avoiding overly long sentences." 
\ No newline at end of file
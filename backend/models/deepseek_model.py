@@ -4,75 +4,279 @@ DeepSeek Model Implementation
 
 import os
 import time
-import json
-import requests
-from typing import Generator
+import logging
+import httpx
+from typing import AsyncGenerator, AsyncIterable, Generator, Iterable, Optional, Tuple
+try:
+    import orjson as _json
+    _dumps = _json.dumps
+except ImportError:
+    import json as _json
+    
+    def _dumps(obj) -> bytes:
+        return _json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+from ._http import ASYNC_CLIENT, CLIENT
 from .base_model import BaseAIModel
 from config import get_logger
 
 logger = get_logger()
 
+_CONTENT_KEY = b'"content":"'
+
+def _extract_delta_content(line: bytes) -> Optional[str]:
+    """
+    Pull delta.content out of a chat.completion.chunk line without decoding the whole object
+    
+    Returns None when the line has no string content field, so the caller can fall back to a full parse
+    """
+    start = line.find(_CONTENT_KEY)
+    if start < 0:
+        return None
+    start += len(_CONTENT_KEY)
+    
+    # Find the closing quote, skipping quotes escaped by an odd run of backslashes
+    end = start
+    while True:
+        end = line.find(b'"', end)
+        if end < 0:
+            return None
+        backslash = end - 1
+        while backslash >= start and line[backslash] == 0x5C:
+            backslash -= 1
+        if (end - 1 - backslash) % 2 == 0:
+            break
+        end += 1
+    
+    raw = line[start:end]
+    if b'\\' not in raw:
+        return raw.decode('utf-8')
+    # Escapes are rare; let the JSON decoder unescape just this string
+    return _json.loads(line[start - 1:end + 1])
+
+_FRAME_END = b'\n\n'
+
+def _normalize_line_endings(chunk: bytes, pending_cr: bool) -> Tuple[bytes, bool]:
+    """
+    Convert the CRLF and CR line endings SSE allows to LF
+    
+    A CR ending the chunk may be the first half of a CRLF, so it is held back
+    and reported, to be prepended to the next chunk
+    """
+    if pending_cr:
+        chunk = b'\r' + chunk
+    if b'\r' not in chunk:
+        return chunk, False
+    pending_cr = chunk.endswith(b'\r')
+    if pending_cr:
+        chunk = chunk[:-1]
+    # JSON escapes CR inside strings, so raw CR bytes only ever end lines
+    return chunk.replace(b'\r\n', b'\n').replace(b'\r', b'\n'), pending_cr
+
+def _iter_sse_frames(chunks: Iterable[bytes]) -> Generator[bytes, None, None]:
+    """Split a stream of byte chunks into SSE events at blank lines, without decoding them"""
+    buf = bytearray()
+    pending_cr = False
+    for chunk in chunks:
+        chunk, pending_cr = _normalize_line_endings(chunk, pending_cr)
+        buf += chunk
+        # bytes.find is a C-level scan, so each chunk costs a few calls rather than a loop per line
+        while (end := buf.find(_FRAME_END)) != -1:
+            frame = bytes(buf[:end])
+            del buf[:end + 2]
+            yield frame
+    if buf:
+        yield bytes(buf)
+
+async def _aiter_sse_frames(chunks: AsyncIterable[bytes]) -> AsyncGenerator[bytes, None]:
+    """Async counterpart of _iter_sse_frames"""
+    buf = bytearray()
+    pending_cr = False
+    async for chunk in chunks:
+        chunk, pending_cr = _normalize_line_endings(chunk, pending_cr)
+        buf += chunk
+        while (end := buf.find(_FRAME_END)) != -1:
+            frame = bytes(buf[:end])
+            del buf[:end + 2]
+            yield frame
+    if buf:
+        yield bytes(buf)
+
+def _sse_frame_content(frame: bytes) -> Optional[str]:
+    """
+    Get the delta text carried by one SSE event
+    
+    Returns None at the [DONE] marker and an empty string for events without text
+    """
+    if frame.startswith(b'data: '):
+        start = 6
+    else:
+        # Comments and other fields may precede the data line
+        start = frame.find(b'\ndata: ')
+        if start < 0:
+            return ''
+        start += 7
+    # Only the data line itself; other fields may follow it in the event
+    end = frame.find(b'\n', start)
+    line = frame[start:] if end < 0 else frame[start:end]
+    line = line.rstrip(b'\r')
+    if line.strip() == b'[DONE]':
+        return None
+    try:
+        content = _extract_delta_content(line)
+        if content is None:
+            content = ''
+            data = _json.loads(line)
+            if 'choices' in data and len(data['choices']) > 0:
+                delta = data['choices'][0].get('delta', {})
+                content = delta.get('content') or ''
+        return content
+    except ValueError as e:
+        logger.warning(f"⚠️ DeepSeek JSON parsing failed: {e}, line content: {repr(line)}")
+        return ''
+
 class DeepSeekModel(BaseAIModel):
     """DeepSeek Model Implementation"""
     def __init__(self):
         super().__init__("deepseek-chat")
         self.api_key = os.getenv("DEEPSEEK_API_KEY", "")
         self.api_url = "https://api.deepseek.com/chat/completions"
+        
+        # Static after construction, so built once instead of per call
+        self._info = {
+            "provider": "DeepSeek",
+            "model": self.model_name,
+            "configured": self.is_configured(),
+            "api_url": self.api_url
+        }
     
     def is_configured(self) -> bool:
         return bool(self.api_key)
     
     def get_model_info(self) -> dict:
-        return {
-            "provider": "DeepSeek",
+        return self._info
+    
+    def _prepare_request(self, user_message: str) -> tuple:
+        """Record the user turn and build the request headers and JSON body"""
+        self.add_to_history("user", user_message)
+        headers = {"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}
+        payload = {
             "model": self.model_name,
-            "configured": self.is_configured(),
-            "api_url": self.api_url
+            "messages": self.get_messages(),
+            "max_tokens": 200,
+            "temperature": 0.7,
+            "stream": True
         }
+        logger.info(f"🤖 Calling DeepSeek API...")
+        logger.info(f"🤖 User message: {user_message}")
+        return headers, _dumps(payload)
+    
+    def _finish_reply(self, reply_parts: list, start_time: float, first_token_time: Optional[float]):
+        """Store the completed reply in history and log its timings"""
+        ai_reply = "".join(reply_parts).strip()
+        duration = time.time() - start_time
+        if ai_reply:
+            self.add_to_history("assistant", ai_reply)
+            if first_token_time:
+                remaining_duration = duration - (first_token_time - start_time)
+                logger.info(f"⚡ DeepSeek first token: {(first_token_time - start_time):.2f}s, remaining: {remaining_duration:.2f}s")
+            logger.info(f"✅ DeepSeek streaming response completed, total duration: {duration:.2f}s")
+            logger.info(f"🤖 DeepSeek complete reply: {ai_reply}")
+        else:
+            logger.warning("❌ DeepSeek streaming response is empty")
     
     def call_api_stream(self, user_message: str) -> Generator[str, None, None]:
         start_time = time.time()
+        # Checked once per reply rather than per token
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
         if not self.is_configured():
             duration = time.time() - start_time
             logger.warning("⚠️ Warning: DEEPSEEK_API_KEY environment variable not set")
             yield "Sorry, DeepSeek assistant is temporarily unavailable."
             return
         try:
-            self.add_to_history("user", user_message)
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
-            payload = {
-                "model": self.model_name,
-                "messages": [
-                    {"role": "system", "content": self.get_system_prompt()},
-                    *self.conversation_history
-                ],
-                "max_tokens": 200,
-                "temperature": 0.7,
-                "stream": True
-            }
-            logger.info(f"🤖 Calling DeepSeek API...")
-            logger.info(f"🤖 User message: {user_message}")
+            headers, body = self._prepare_request(user_message)
             try:
-                response = requests.post(
-                    self.api_url,
-                    headers=headers,
-                    json=payload,
-                    timeout=15,
-                    stream=True
-                )
-            except requests.exceptions.ConnectionError as e:
+                # Keep-alive HTTP/2 connections are reused across turns instead of a new TLS handshake per call
+                request = CLIENT.build_request("POST", self.api_url, headers=headers, content=body)
+                response = CLIENT.send(request, stream=True)
+            except httpx.TimeoutException as e:
+                duration = time.time() - start_time
+                logger.error(f"❌ DeepSeek request timeout: {e}, duration: {duration:.2f}s")
+                yield "Sorry, DeepSeek response timed out, please try again later."
+                return
+            except httpx.TransportError as e:
                 duration = time.time() - start_time
                 logger.error(f"❌ DeepSeek connection error: {e}, duration: {duration:.2f}s")
                 yield "Sorry, unable to connect to DeepSeek service."
                 return
-            except requests.exceptions.Timeout as e:
+            except Exception as e:
+                duration = time.time() - start_time
+                logger.error(f"❌ DeepSeek request exception: {e}, duration: {duration:.2f}s")
+                yield "Sorry, DeepSeek encountered a network issue."
+                return
+            if response.status_code == 200:
+                logger.info("🔄 Starting to receive DeepSeek streaming response...")
+                reply_parts = []
+                first_token_time = None
+                try:
+                    # Raw bytes go straight to the JSON decoder without a UTF-8 decode step
+                    for frame in _iter_sse_frames(response.iter_bytes()):
+                        content = _sse_frame_content(frame)
+                        if content is None:
+                            break
+                        if content:
+                            if first_token_time is None:
+                                first_token_time = time.time()
+                                first_token_duration = first_token_time - start_time
+                                logger.info(f"⚡ DeepSeek first token arrived, duration: {first_token_duration:.2f}s")
+                            reply_parts.append(content)
+                            if debug_enabled:
+                                logger.debug("🔄 DeepSeek receiving content: %r", content)
+                            yield content
+                except Exception as e:
+                    logger.warning(f"⚠️ DeepSeek streaming processing exception: {e}")
+                    if not reply_parts:
+                        raise e
+                finally:
+                    # Also runs when the consumer stops early, returning the stream to the pool
+                    response.close()
+                self._finish_reply(reply_parts, start_time, first_token_time)
+            else:
+                response.read()
+                response.close()
+                duration = time.time() - start_time
+                logger.error(f"❌ DeepSeek API error: {response.status_code} - {response.text}, duration: {duration:.2f}s")
+                yield "Sorry, DeepSeek cannot answer your question right now."
+                return
+        except Exception as e:
+            duration = time.time() - start_time
+            logger.error(f"❌ DeepSeek API call failed: {e}, duration: {duration:.2f}s")
+            yield "Sorry, DeepSeek encountered some technical issues."
+            return
+    
+    async def call_api_stream_async(self, user_message: str) -> AsyncGenerator[str, None]:
+        """Same as call_api_stream, but waits for the network on the event loop instead of a thread"""
+        start_time = time.time()
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        if not self.is_configured():
+            logger.warning("⚠️ Warning: DEEPSEEK_API_KEY environment variable not set")
+            yield "Sorry, DeepSeek assistant is temporarily unavailable."
+            return
+        try:
+            headers, body = self._prepare_request(user_message)
+            try:
+                request = ASYNC_CLIENT.build_request("POST", self.api_url, headers=headers, content=body)
+                response = await ASYNC_CLIENT.send(request, stream=True)
+            except httpx.TimeoutException as e:
                 duration = time.time() - start_time
                 logger.error(f"❌ DeepSeek request timeout: {e}, duration: {duration:.2f}s")
                 yield "Sorry, DeepSeek response timed out, please try again later."
                 return
+            except httpx.TransportError as e:
+                duration = time.time() - start_time
+                logger.error(f"❌ DeepSeek connection error: {e}, duration: {duration:.2f}s")
+                yield "Sorry, unable to connect to DeepSeek service."
+                return
             except Exception as e:
                 duration = time.time() - start_time
                 logger.error(f"❌ DeepSeek request exception: {e}, duration: {duration:.2f}s")
@@ -80,47 +284,32 @@ class DeepSeekModel(BaseAIModel):
                 return
             if response.status_code == 200:
                 logger.info("🔄 Starting to receive DeepSeek streaming response...")
-                ai_reply = ""
+                reply_parts = []
                 first_token_time = None
                 try:
-                    for line in response.iter_lines(decode_unicode=True):
-                        if line:
-                            if not line.startswith('data: '):
-                                continue
-                            line = line[6:]
-                            if line.strip() == '[DONE]':
-                                break
-                            try:
-                                data = json.loads(line)
-                                if 'choices' in data and len(data['choices']) > 0:
-                                    delta = data['choices'][0].get('delta', {})
-                                    content = delta.get('content', '')
-                                    if content:
-                                        if first_token_time is None:
-                                            first_token_time = time.time()
-                                            first_token_duration = first_token_time - start_time
-                                            logger.info(f"⚡ DeepSeek first token arrived, duration: {first_token_duration:.2f}s")
-                                        ai_reply += content
-                                        logger.debug(f"🔄 DeepSeek receiving content: {repr(content)}")
-                                        yield content
-                            except json.JSONDecodeError as e:
-                                logger.warning(f"⚠️ DeepSeek JSON parsing failed: {e}, line content: {repr(line)}")
-                                continue
+                    async for frame in _aiter_sse_frames(response.aiter_bytes()):
+                        content = _sse_frame_content(frame)
+                        if content is None:
+                            break
+                        if content:
+                            if first_token_time is None:
+                                first_token_time = time.time()
+                                first_token_duration = first_token_time - start_time
+                                logger.info(f"⚡ DeepSeek first token arrived, duration: {first_token_duration:.2f}s")
+                            reply_parts.append(content)
+                            if debug_enabled:
+                                logger.debug("🔄 DeepSeek receiving content: %r", content)
+                            yield content
                 except Exception as e:
                     logger.warning(f"⚠️ DeepSeek streaming processing exception: {e}")
-                    if not ai_reply:
+                    if not reply_parts:
                         raise e
-                duration = time.time() - start_time
-                if ai_reply.strip():
-                    self.add_to_history("assistant", ai_reply.strip())
-                    if first_token_time:
-                        remaining_duration = duration - (first_token_time - start_time)
-                        logger.info(f"⚡ DeepSeek first token: {(first_token_time - start_time):.2f}s, remaining: {remaining_duration:.2f}s")
-                    logger.info(f"✅ DeepSeek streaming response completed, total duration: {duration:.2f}s")
-                    logger.info(f"🤖 DeepSeek complete reply: {ai_reply.strip()}")
-                else:
-                    logger.warning("❌ DeepSeek streaming response is empty")
+                finally:
+                    await response.aclose()
+                self._finish_reply(reply_parts, start_time, first_token_time)
             else:
+                await response.aread()
+                await response.aclose()
                 duration = time.time() - start_time
                 logger.error(f"❌ DeepSeek API error: {response.status_code} - {response.text}, duration: {duration:.2f}s")
                 yield "Sorry, DeepSeek cannot answer your question right now."
@@ -129,4 +318,4 @@ class DeepSeekModel(BaseAIModel):
             duration = time.time() - start_time
             logger.error(f"❌ DeepSeek API call failed: {e}, duration: {duration:.2f}s")
             yield "Sorry, DeepSeek encountered some technical issues."
-            return 
\ No newline at end of file
+            return
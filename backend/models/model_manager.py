@@ -4,7 +4,7 @@ Responsible for model initialization, switching and unified calling
 """
 
 import os
-from typing import Generator, Dict, Any
+from typing import AsyncGenerator, Generator, Dict, Any
 from .deepseek_model import DeepSeekModel
 from .qwen_model import QwenModel
 from .base_model import BaseAIModel
@@ -84,7 +84,27 @@ class ModelManager:
             
             logger.info(f"🚀 Using {model.get_model_info()['provider']} model")
             
-            for chunk in model.call_api_stream(user_message):
+            yield from model.call_api_stream(user_message)
+                
+        except Exception as e:
+            logger.error(f"❌ AI model call failed: {e}")
+            yield "Sorry, AI model encountered an issue while processing."
+            return
+    
+    async def call_ai_api_stream_async(self, user_message: str) -> AsyncGenerator[str, None]:
+        """Unified AI API calling interface for callers running on the event loop"""
+        logger.info(f"🎯 Current AI model: {self.current_provider}")
+        
+        try:
+            model = self.get_current_model()
+            
+            if not model.is_configured():
+                yield f"Sorry, {self.current_provider} model is not properly configured."
+                return
+            
+            logger.info(f"🚀 Using {model.get_model_info()['provider']} model")
+            
+            async for chunk in model.call_api_stream_async(user_message):
                 yield chunk
                 
         except Exception as e:
@@ -96,7 +116,7 @@ class ModelManager:
         """Get current model's conversation history"""
         try:
             model = self.get_current_model()
-            return model.conversation_history
+            return model.get_conversation_history()
         except:
             return []
     
@@ -104,7 +124,7 @@ class ModelManager:
         """Clear current model's conversation history"""
         try:
             model = self.get_current_model()
-            model.conversation_history = []
+            model.clear_history()
             logger.info("🗑️ Conversation history cleared")
         except Exception as e:
             logger.error(f"❌ Failed to clear conversation history: {e}")
@@ -4,8 +4,11 @@ Qwen-Plus Model Implementation
 
 import os
 import time
-from typing import Generator
-from openai import OpenAI
+import logging
+from typing import AsyncGenerator, Generator, Optional
+import httpx
+from openai import AsyncOpenAI, OpenAI
+from ._http import ASYNC_CLIENT, CLIENT
 from .base_model import BaseAIModel
 from config import get_logger
 
@@ -20,11 +23,29 @@ class QwenModel(BaseAIModel):
         self.base_url = "https://dashscope.aliyuncs.com/compatible-mode/v1"
         
         self.client = None
+        self.async_client = None
         if self.api_key:
             self.client = OpenAI(
                 api_key=self.api_key,
                 base_url=self.base_url,
+                timeout=httpx.Timeout(30.0, connect=3.0),
+                # Shares the keep-alive HTTP/2 pool, so only the first request pays for the handshakes
+                http_client=CLIENT,
             )
+            self.async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=httpx.Timeout(30.0, connect=3.0),
+                http_client=ASYNC_CLIENT,
+            )
+        
+        # Static after construction, so built once instead of per call
+        self._info = {
+            "provider": "Qwen-Plus (Alibaba Cloud)",
+            "model": self.model_name,
+            "configured": self.is_configured(),
+            "base_url": self.base_url
+        }
     
     def is_configured(self) -> bool:
         """Check if Qwen-Plus is properly configured"""
@@ -32,17 +53,40 @@ class QwenModel(BaseAIModel):
     
     def get_model_info(self) -> dict:
         """Get Qwen-Plus model information"""
-        return {
-            "provider": "Qwen-Plus (Alibaba Cloud)",
-            "model": self.model_name,
-            "configured": self.is_configured(),
-            "base_url": self.base_url
-        }
+        return self._info
+    
+    def _prepare_messages(self, user_message: str) -> list:
+        """Record the user turn and return the messages to send"""
+        self.add_to_history("user", user_message)
+        
+        logger.info(f"🤖 Calling Qwen-Plus API...")
+        logger.info(f"🤖 User message: {user_message}")
+        
+        return self.get_messages()
+    
+    def _finish_reply(self, reply_parts: list, start_time: float, first_token_time: Optional[float]):
+        """Store the completed reply in history and log its timings"""
+        ai_reply = "".join(reply_parts).strip()
+        duration = time.time() - start_time
+        
+        if ai_reply:
+            self.add_to_history("assistant", ai_reply)
+            
+            if first_token_time:
+                remaining_duration = duration - (first_token_time - start_time)
+                logger.info(f"⚡ Qwen first token: {(first_token_time - start_time):.2f}s, remaining: {remaining_duration:.2f}s")
+            
+            logger.info(f"✅ Qwen-Plus streaming response completed, total duration: {duration:.2f}s")
+            logger.info(f"🤖 Qwen complete reply: {ai_reply}")
+        else:
+            logger.warning("❌ Qwen streaming response is empty")
     
     def call_api_stream(self, user_message: str) -> Generator[str, None, None]:
         """Call Qwen-Plus API for streaming response"""
         
         start_time = time.time()
+        # Checked once per reply rather than per token
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
         
         if not self.is_configured():
             duration = time.time() - start_time
@@ -51,15 +95,7 @@ class QwenModel(BaseAIModel):
             return
         
         try:
-            self.add_to_history("user", user_message)
-            
-            messages = [
-                {"role": "system", "content": self.get_system_prompt()},
-                *self.conversation_history
-            ]
-            
-            logger.info(f"🤖 Calling Qwen-Plus API...")
-            logger.info(f"🤖 User message: {user_message}")
+            messages = self._prepare_messages(user_message)
             
             try:
                 completion = self.client.chat.completions.create(
@@ -77,7 +113,7 @@ class QwenModel(BaseAIModel):
                 return
             
             logger.info("🔄 Starting to receive Qwen streaming response...")
-            ai_reply = ""
+            reply_parts = []
             first_token_time = None
             
             try:
@@ -91,32 +127,87 @@ class QwenModel(BaseAIModel):
                         delta = chunk.choices[0].delta
                         if hasattr(delta, 'content') and delta.content:
                             content = delta.content
-                            ai_reply += content
-                            logger.debug(f"🔄 Qwen receiving content: {repr(content)}")
+                            reply_parts.append(content)
+                            if debug_enabled:
+                                logger.debug("🔄 Qwen receiving content: %r", content)
                             
                             yield content
                             
             except Exception as e:
                 logger.warning(f"⚠️ Qwen streaming processing exception: {e}")
-                if not ai_reply:
+                if not reply_parts:
                     raise e
             
+            self._finish_reply(reply_parts, start_time, first_token_time)
+                
+        except Exception as e:
             duration = time.time() - start_time
+            logger.error(f"❌ Qwen-Plus API call failed: {e}, duration: {duration:.2f}s")
+            yield "Sorry, Qwen encountered an issue while processing."
+            return 
+    
+    async def call_api_stream_async(self, user_message: str) -> AsyncGenerator[str, None]:
+        """Same as call_api_stream, but waits for the network on the event loop instead of a thread"""
+        
+        start_time = time.time()
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        
+        if not self.is_configured():
+            logger.warning("⚠️ Warning: QWEN_PLUS_API_KEY environment variable not set or Qwen client not initialized")
+            yield "Sorry, Qwen-Plus is temporarily unavailable."
+            return
+        
+        try:
+            messages = self._prepare_messages(user_message)
             
-            if ai_reply.strip():
-                self.add_to_history("assistant", ai_reply.strip())
-                
-                if first_token_time:
-                    remaining_duration = duration - (first_token_time - start_time)
-                    logger.info(f"⚡ Qwen first token: {(first_token_time - start_time):.2f}s, remaining: {remaining_duration:.2f}s")
-                
-                logger.info(f"✅ Qwen-Plus streaming response completed, total duration: {duration:.2f}s")
-                logger.info(f"🤖 Qwen complete reply: {ai_reply.strip()}")
-            else:
-                logger.warning("❌ Qwen streaming response is empty")
+            try:
+                completion = await self.async_client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages,
+                    max_tokens=200,
+                    temperature=0.7,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+            except Exception as e:
+                duration = time.time() - start_time
+                logger.error(f"❌ Qwen request exception: {e}, duration: {duration:.2f}s")
+                yield "Sorry, unable to connect to Qwen service."
+                return
+            
+            logger.info("🔄 Starting to receive Qwen streaming response...")
+            reply_parts = []
+            first_token_time = None
+            
+            try:
+                async for chunk in completion:
+                    if first_token_time is None:
+                        first_token_time = time.time()
+                        first_token_duration = first_token_time - start_time
+                        logger.info(f"⚡ Qwen first token arrived, duration: {first_token_duration:.2f}s")
+                    
+                    if chunk.choices and len(chunk.choices) > 0:
+                        delta = chunk.choices[0].delta
+                        if hasattr(delta, 'content') and delta.content:
+                            content = delta.content
+                            reply_parts.append(content)
+                            if debug_enabled:
+                                logger.debug("🔄 Qwen receiving content: %r", content)
+                            
+                            yield content
+                            
+            except Exception as e:
+                logger.warning(f"⚠️ Qwen streaming processing exception: {e}")
+                if not reply_parts:
+                    raise e
+            finally:
+                # Releases the connection when the consumer stops early
+                await completion.close()
+            
+            self._finish_reply(reply_parts, start_time, first_token_time)
                 
         except Exception as e:
             duration = time.time() - start_time
             logger.error(f"❌ Qwen-Plus API call failed: {e}, duration: {duration:.2f}s")
             yield "Sorry, Qwen encountered an issue while processing."
-            return 
\ No newline at end of file
+            return
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+STT Model Base Class Interface
+Defines interfaces that all STT models must implement
+"""
+
+import numpy as np
+from typing import Dict, Any
+from abc import ABC, abstractmethod
+
+# Full-scale int16 to [-1, 1) float; a power of two, so the scaling is exact
+INT16_SCALE = np.float32(1.0 / 32768.0)
+
+def configure_torch_threads(num_threads: int):
+    """Cap torch's CPU thread pools so inference doesn't oversubscribe the server's cores"""
+    import torch
+    
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set before the first inter-op parallel work runs
+        pass
+
+class BaseSTTModel(ABC):
+    """Base class for STT models"""
+    
+    @abstractmethod
+    def transcribe(self, audio_data: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+        """Transcribe audio data to text"""
+        pass
+    
+    @abstractmethod
+    def is_loaded(self) -> bool:
+        """Check if model is loaded"""
+        pass
@@ -0,0 +1,83 @@
+"""
+Whisper STT Model Implementation
+Runs on faster-whisper (CTranslate2) with int8-quantized weights
+"""
+
+import numpy as np
+from math import gcd
+from typing import Dict, Any
+from scipy.signal import resample_poly
+
+from config import get_logger, STT_CONFIG
+from .base_stt import BaseSTTModel, INT16_SCALE
+
+logger = get_logger()
+
+class WhisperModel(BaseSTTModel):
+    """Whisper STT model implementation"""
+    
+    def __init__(self):
+        self.model = None
+        self.model_size = STT_CONFIG.whisper_model
+        self.language = None if STT_CONFIG.language == "auto" else STT_CONFIG.language
+        
+    def load_model(self):
+        """Load Whisper model"""
+        try:
+            from faster_whisper import WhisperModel as FasterWhisperModel
+            
+            logger.info(f"Loading Whisper model: {self.model_size}")
+            # int8 weights cut memory and run on the CPU's integer dot-product instructions
+            self.model = FasterWhisperModel(
+                self.model_size,
+                device="cpu",
+                compute_type="int8",
+                cpu_threads=STT_CONFIG.num_threads,
+            )
+            logger.info("✅ Whisper model loaded successfully")
+            return True
+            
+        except Exception as e:
+            logger.error(f"❌ Failed to load Whisper model: {e}")
+            return False
+    
+    def transcribe(self, audio_data: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+        """Transcribe audio using Whisper"""
+        if not self.model:
+            raise RuntimeError("Whisper model not loaded")
+        
+        try:
+            # Whisper expects float32 audio normalized to [-1, 1]; float32 input is used as-is
+            if audio_data.dtype == np.int16:
+                # Cast and scale in one pass into a single float32 array
+                audio_float = np.multiply(audio_data, INT16_SCALE, dtype=np.float32)
+            else:
+                audio_float = np.asarray(audio_data, dtype=np.float32)
+            
+            # Whisper expects 16kHz; the polyphase filter handles any rate ratio and anti-aliases
+            if sample_rate != 16000:
+                divisor = gcd(sample_rate, 16000)
+                audio_float = resample_poly(audio_float, 16000 // divisor, sample_rate // divisor).astype(np.float32, copy=False)
+            
+            # Segments are decoded lazily, so collect them before reading the results
+            segments, info = self.model.transcribe(
+                audio_float,
+                language=self.language,
+                task="transcribe",
+                vad_filter=True
+            )
+            segments = list(segments)
+            
+            return {
+                "text": "".join(segment.text for segment in segments).strip(),
+                "language": info.language or "unknown",
+                # Speech in any segment keeps the transcription
+                "no_speech_prob": min((segment.no_speech_prob for segment in segments), default=0.0)
+            }
+            
+        except Exception as e:
+            logger.error(f"❌ Whisper transcription failed: {e}")
+            raise
+    
+    def is_loaded(self) -> bool:
+        return self.model is not None
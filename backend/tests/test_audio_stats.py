@@ -0,0 +1,75 @@
+"""
+Tests that the numba audio kernels match plain numpy
+"""
+
+import numpy as np
+import pytest
+
+from audio_stats import audio_qc, distinct_values_upto, offset_and_scale, pcm_rms, scale_q15
+
+rng = np.random.default_rng(0)
+
+@pytest.mark.parametrize("audio", [
+    rng.integers(-32768, 32768, 4801, dtype=np.int16),
+    rng.integers(-2**31, 2**31, 4801, dtype=np.int32),
+    rng.standard_normal(4801).astype(np.float32),
+    rng.integers(-32768, 32768, (2, 480), dtype=np.int16),
+])
+def test_pcm_rms_matches_numpy(audio):
+    expected = np.sqrt(np.mean(audio.astype(np.float64) ** 2))
+
+    assert pcm_rms(audio) == pytest.approx(expected, rel=1e-9)
+
+def test_pcm_rms_empty():
+    assert pcm_rms(np.zeros(0, dtype=np.int16)) == 0.0
+
+@pytest.mark.parametrize("gain", [0.0, 0.25, 0.7071, 1.0, 1.9, 3.5])
+def test_scale_q15_matches_numpy(gain):
+    audio = np.concatenate([
+        rng.integers(-32768, 32768, 4000, dtype=np.int16),
+        np.array([-32768, -1, 0, 1, 32767], dtype=np.int16),
+    ])
+    gain_q15 = int(round(gain * 32768))
+    expected = np.clip((audio.astype(np.int64) * gain_q15) >> 15, -32768, 32767).astype(np.int16)
+
+    np.testing.assert_array_equal(scale_q15(audio, gain_q15), expected)
+
+def test_scale_q15_into_out_buffer():
+    audio = rng.integers(-32768, 32768, 100, dtype=np.int16)
+    out = np.empty_like(audio)
+
+    assert scale_q15(audio, 1 << 15, out) is out
+    np.testing.assert_array_equal(out, audio)
+
+def test_audio_qc_matches_numpy():
+    audio = (rng.standard_normal(4800) * 0.1 + 0.01).astype(np.float32)
+    x = audio.astype(np.float64)
+    stats = audio_qc(audio)
+
+    assert stats.min == pytest.approx(x.min())
+    assert stats.max == pytest.approx(x.max())
+    assert stats.mean == pytest.approx(x.mean(), rel=1e-9)
+    assert stats.rms == pytest.approx(np.sqrt(np.mean(x ** 2)), rel=1e-9)
+    assert stats.std == pytest.approx(x.std(), rel=1e-6)
+    assert stats.abs_max == pytest.approx(np.abs(x).max())
+    assert stats.zero_crossings == int(np.count_nonzero(np.diff(np.signbit(x))))
+    assert not stats.has_nan_inf
+
+def test_audio_qc_flags_nan_and_inf():
+    for bad in (np.nan, np.inf, -np.inf):
+        audio = np.zeros(16, dtype=np.float32)
+        audio[7] = bad
+        assert audio_qc(audio).has_nan_inf
+
+def test_offset_and_scale_saturates():
+    audio = np.array([0.5, -0.5, 0.01, 0.2], dtype=np.float32)
+    expected = np.clip((audio - np.float32(0.1)) * np.float32(3.0), -1.0, 1.0)
+
+    offset_and_scale(audio, 0.1, 3.0)
+    np.testing.assert_allclose(audio, expected, rtol=1e-6)
+
+def test_distinct_values_upto():
+    audio = np.array([3, 1, 3, 2, 1, 5, 2], dtype=np.int16)
+
+    np.testing.assert_array_equal(distinct_values_upto(audio, 10), [1, 2, 3, 5])
+    assert len(distinct_values_upto(np.arange(100, dtype=np.int16), 10)) == 11
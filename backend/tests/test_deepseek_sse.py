@@ -0,0 +1,83 @@
+"""
+Tests for the DeepSeek SSE framing and delta parsing fast path
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from models.deepseek_model import (
+    _aiter_sse_frames, _extract_delta_content, _iter_sse_frames, _sse_frame_content
+)
+
+def compact_json(obj, ensure_ascii=True) -> bytes:
+    """Encode like the DeepSeek API does, with no spaces after separators"""
+    return json.dumps(obj, ensure_ascii=ensure_ascii, separators=(",", ":")).encode('utf-8')
+
+def sse_event(content) -> bytes:
+    return b'data: ' + compact_json({"choices": [{"index": 0, "delta": {"content": content}}]}, ensure_ascii=False)
+
+def split_bytes(data: bytes, size: int) -> list:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+def sync_contents(chunks) -> list:
+    return [_sse_frame_content(frame) for frame in _iter_sse_frames(chunks)]
+
+def async_contents(chunks) -> list:
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    async def collect():
+        return [_sse_frame_content(frame) async for frame in _aiter_sse_frames(source())]
+
+    return asyncio.run(collect())
+
+@pytest.mark.parametrize("newline", [b'\n', b'\r\n', b'\r'])
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+@pytest.mark.parametrize("collect", [sync_contents, async_contents])
+def test_frames_split_on_every_line_ending(newline, chunk_size, collect):
+    events = [sse_event("Hel"), sse_event("lo"), b': keep-alive', sse_event(" there"), b'data: [DONE]']
+    stream = b''.join(event + newline + newline for event in events)
+
+    assert collect(split_bytes(stream, chunk_size)) == ["Hel", "lo", "", " there", None]
+
+@pytest.mark.parametrize("collect", [sync_contents, async_contents])
+def test_keep_alive_comment_before_data_line(collect):
+    stream = b': ping\n' + sse_event("hi") + b'\n\n'
+
+    assert collect([stream]) == ["hi"]
+
+@pytest.mark.parametrize("collect", [sync_contents, async_contents])
+def test_multibyte_character_split_across_chunks(collect):
+    stream = sse_event("你好") + b'\n\n'
+
+    assert collect(split_bytes(stream, 1)) == ["你好"]
+
+def test_trailing_event_without_blank_line():
+    assert sync_contents([sse_event("end")]) == ["end"]
+
+@pytest.mark.parametrize("content", [
+    'say "hi"',
+    'back\\slash\\',
+    'line\nbreak\ttab',
+    'unicode 你好 \U0001F600',
+])
+def test_escaped_content(content):
+    line = compact_json({"choices": [{"delta": {"content": content}}]})
+
+    assert _extract_delta_content(line) == content
+    assert _sse_frame_content(b'data: ' + line) == content
+
+def test_null_content_is_empty():
+    line = b'{"choices":[{"delta":{"role":"assistant","content":null}}]}'
+
+    assert _extract_delta_content(line) is None
+    assert _sse_frame_content(b'data: ' + line) == ""
+
+def test_spaced_json_falls_back_to_full_parse():
+    line = json.dumps({"choices": [{"delta": {"content": 'a"b'}}]}).encode('ascii')
+
+    assert _extract_delta_content(line) is None
+    assert _sse_frame_content(b'data: ' + line) == 'a"b'
@@ -0,0 +1,57 @@
+"""
+Tests for the in-memory WAV parsing used by the TTS manager
+"""
+
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from tts.tts_manager import parse_wav_header, wav_samples
+
+def make_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples.astype('<i2').tobytes())
+    return buf.getvalue()
+
+def insert_chunk(wav: bytes, chunk_id: bytes, payload: bytes) -> bytes:
+    """Insert a chunk between fmt and data, padded to an even length"""
+    data_at = wav.index(b'data')
+    chunk = chunk_id + len(payload).to_bytes(4, 'little') + payload + b'\0' * (len(payload) & 1)
+    return wav[:data_at] + chunk + wav[data_at:]
+
+def test_plain_wav():
+    samples = np.array([0, 1, -1, 32767, -32768], dtype=np.int16)
+    wav = make_wav(samples, 22050)
+
+    assert parse_wav_header(wav) == (22050, 44)
+    sample_rate, parsed = wav_samples(wav)
+    assert sample_rate == 22050
+    np.testing.assert_array_equal(parsed, samples)
+
+def test_extra_chunks_before_data():
+    samples = np.arange(-50, 50, dtype=np.int16)
+    wav = make_wav(samples, 16000)
+    # An odd-sized LIST chunk exercises the padding byte
+    wav = insert_chunk(wav, b'LIST', b'INFOISFT\x05\x00\x00\x00Lavf\x00')
+    wav = insert_chunk(wav, b'fact', (len(samples)).to_bytes(4, 'little'))
+
+    sample_rate, data_start = parse_wav_header(wav)
+    assert sample_rate == 16000
+    assert wav[data_start - 8:data_start - 4] == b'data'
+    np.testing.assert_array_equal(wav_samples(wav)[1], samples)
+
+def test_not_a_wav():
+    with pytest.raises(ValueError):
+        parse_wav_header(b'ID3\x04' + b'\0' * 40)
+
+def test_missing_data_chunk():
+    wav = make_wav(np.zeros(4, dtype=np.int16), 24000)
+
+    with pytest.raises(ValueError):
+        parse_wav_header(wav[:wav.index(b'data')])
@@ -4,27 +4,138 @@ Text-to-Speech Manager
 Unified interface for different TTS providers
 """
 
-import subprocess
-import tempfile
 import os
-import wave
+import re
+import shutil
+import functools
+import logging
+import subprocess
+import hashlib
+import threading
 import numpy as np
 import time
-from typing import Optional, Tuple, Dict, Any
+from collections import OrderedDict
+from math import gcd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, Dict, Any, Iterator, List
 from abc import ABC, abstractmethod
+from scipy.signal import resample_poly
+try:
+    import xxhash
+    
+    def _digest(data: bytes) -> bytes:
+        return xxhash.xxh3_128(data).digest()
+except ImportError:
+    def _digest(data: bytes) -> bytes:
+        return hashlib.blake2b(data, digest_size=16).digest()
 
+from audio_stats import scale_q15
 from config import get_logger, TTS_CONFIG, PERFORMANCE_CONFIG
 
 logger = get_logger()
 
+# Output sample rate of synthesized speech
+TTS_SAMPLE_RATE = 24000
+
+# say processes kept started and waiting for text on stdin, so the
+# fork/exec and start-up cost is paid before an utterance arrives
+STANDBY_SAY_PROCESSES = 2
+
+def parse_wav_header(wav: bytes) -> Tuple[int, int]:
+    """Walk the chunk headers of a RIFF/WAVE file, returning its sample rate and where the sample data starts"""
+    if wav[:4] != b'RIFF' or wav[8:12] != b'WAVE':
+        raise ValueError("Not a RIFF/WAVE stream")
+    
+    sample_rate = TTS_SAMPLE_RATE
+    offset = 12
+    while offset + 8 <= len(wav):
+        chunk_id = wav[offset:offset + 4]
+        if chunk_id == b'data':
+            return sample_rate, offset + 8
+        chunk_size = int.from_bytes(wav[offset + 4:offset + 8], 'little')
+        if chunk_id == b'fmt ':
+            sample_rate = int.from_bytes(wav[offset + 12:offset + 16], 'little')
+        # Chunks are padded to an even length
+        offset += 8 + chunk_size + (chunk_size & 1)
+    raise ValueError("WAV data chunk not found")
+
+def wav_samples(wav: bytes) -> Tuple[int, np.ndarray]:
+    """
+    Get the sample rate and int16 samples of a WAV file held in memory, without copying the samples
+    
+    The data chunk's size field is ignored: a WAV written to a pipe can't have
+    it patched in after the audio, so everything after the data chunk header is audio
+    """
+    sample_rate, data_start = parse_wav_header(wav)
+    # An odd trailing byte can't form a sample
+    return sample_rate, np.frombuffer(wav, dtype='<i2', offset=data_start, count=(len(wav) - data_start) // 2)
+
+def resample_to_output_rate(samples: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Resample int16 audio to TTS_SAMPLE_RATE in process with a polyphase filter"""
+    divisor = gcd(sample_rate, TTS_SAMPLE_RATE)
+    resampled = resample_poly(samples, TTS_SAMPLE_RATE // divisor, sample_rate // divisor)
+    return np.clip(np.rint(resampled), -32768, 32767).astype(np.int16)
+
+# Clause boundaries: after Western punctuation followed by whitespace, or
+# directly after full-width punctuation, which has no space after it
+SEGMENT_BOUNDARY_PATTERN = re.compile(r'(?<=[.!?,;])\s+|(?<=[。！？，；])')
+
+# Sentence boundaries, used to render longer texts in parallel
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'(?<=[.!?])\s+|(?<=[。！？])')
+
+def split_segments(text: str, pattern: re.Pattern = SEGMENT_BOUNDARY_PATTERN) -> list:
+    """Split text into clauses (or sentences) that can be synthesized independently"""
+    return [segment for segment in pattern.split(text) if segment.strip()]
+
+# One line of `say -v ?`: "Name    locale    # sample sentence"; names may contain spaces
+VOICE_LINE_PATTERN = re.compile(r'^(.+?)\s+([A-Za-z]{2,3}[_-][A-Za-z0-9]+)\s*#\s?(.*)$')
+
+@functools.lru_cache(maxsize=1)
+def list_macos_voices() -> list:
+    """
+    List the installed macOS voices, parsed once per process
+    
+    Failures raise and are not cached, so a later call tries again
+    """
+    result = subprocess.run(
+        ['say', '-v', '?'],
+        capture_output=True,
+        text=True,
+        timeout=5,
+        check=True
+    )
+    
+    voices = []
+    for line in result.stdout.splitlines():
+        match = VOICE_LINE_PATTERN.match(line.strip())
+        if match:
+            voice_name, language, description = match.groups()
+            voices.append({
+                "name": voice_name,
+                "language": language,
+                "description": description.strip()
+            })
+    return voices
+
 class BaseTTSProvider(ABC):
     """Base class for TTS providers"""
     
     @abstractmethod
-    def synthesize(self, text: str) -> Optional[Tuple[int, np.ndarray]]:
-        """Synthesize text to speech"""
+    def synthesize(self, text: str, *, dtype=np.int16) -> Optional[Tuple[int, np.ndarray]]:
+        """Synthesize text to speech as int16 samples, or float32 in [-1, 1] with dtype=np.float32"""
         pass
     
+    def synthesize_stream(self, text: str, *, dtype=np.int16) -> Iterator[Tuple[int, np.ndarray]]:
+        """Synthesize text clause by clause, yielding each clause's audio as soon as it is ready"""
+        for segment in split_segments(text):
+            result = self.synthesize(segment, dtype=dtype)
+            if result:
+                yield result
+    
+    def synthesize_batch(self, texts: List[str], *, dtype=np.int16) -> List[Optional[Tuple[int, np.ndarray]]]:
+        """Synthesize several texts, returning one result (or None) per text in order"""
+        return [self.synthesize(text, dtype=dtype) for text in texts]
+    
     @abstractmethod
     def get_available_voices(self) -> list:
         """Get list of available voices"""
@@ -42,64 +153,119 @@ class MacOSTTSProvider(BaseTTSProvider):
         self.voice = TTS_CONFIG.voice
         self.rate = TTS_CONFIG.rate
         self.volume = TTS_CONFIG.volume
+        # Volume as a Q15 fixed-point gain, so scaling stays in integer arithmetic
+        self._volume_q15 = int(round(self.volume * 32768))
+        if self.volume != 1.0:
+            # Compile (or load) the scaling kernel now rather than on the first reply
+            scale_q15(np.zeros(64, dtype=np.int16), self._volume_q15)
+        # Renders the next clause while the current one is being played
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts-prefetch")
+        # Renders the sentences of a longer text side by side; each say process is single-threaded
+        self._pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="tts-segment")
+        
+        # Probed once; say doesn't come or go while the server runs
+        say_path = shutil.which('say')
+        self._available = say_path is not None
         
-    def synthesize(self, text: str) -> Optional[Tuple[int, np.ndarray]]:
-        """Synthesize text using macOS say command"""
+        # say renders 24kHz 16-bit mono WAV straight to stdout, so no
+        # resampling step or temporary files are needed; the text is read
+        # from stdin so the process can be started before the text is known
+        self._say_cmd = [
+            say_path or 'say',
+            '-v', self.voice,
+            '-r', str(self.rate),
+            '--file-format=WAVE',
+            f'--data-format=LEI16@{TTS_SAMPLE_RATE}',
+            '-o', '/dev/stdout',
+            '-f', '-'
+        ]
+        self._timeout = PERFORMANCE_CONFIG.tts_timeout
+        # The few variables say needs, built once instead of copying the server's environment per spawn
+        self._say_env = {name: os.environ[name] for name in ('PATH', 'HOME', 'TMPDIR') if name in os.environ}
+        self._say_env['LANG'] = os.environ.get('LANG', 'en_US.UTF-8')
+        self._standby = []
+        self._standby_lock = threading.Lock()
+    
+    def _spawn_say(self) -> subprocess.Popen:
+        """Start a say process that waits for its text on stdin"""
+        return subprocess.Popen(
+            self._say_cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=1 << 20,
+            # With an absolute path and no fd-closing pass, CPython can use posix_spawn
+            close_fds=False,
+            env=self._say_env
+        )
+    
+    def _refill_standby(self):
+        """Top the standby say processes back up"""
+        with self._standby_lock:
+            while len(self._standby) < STANDBY_SAY_PROCESSES:
+                self._standby.append(self._spawn_say())
+    
+    def _take_say_process(self) -> subprocess.Popen:
+        """Take a standby say process, starting one inline only if none is ready"""
+        proc = None
+        with self._standby_lock:
+            while self._standby and proc is None:
+                candidate = self._standby.pop()
+                if candidate.poll() is None:
+                    proc = candidate
+        self._prefetch_executor.submit(self._refill_standby)
+        return proc or self._spawn_say()
+        
+    def synthesize(self, text: str, *, dtype=np.int16) -> Optional[Tuple[int, np.ndarray]]:
+        """Synthesize text using macOS say command, rendering multiple sentences in parallel"""
+        segments = split_segments(text, SENTENCE_BOUNDARY_PATTERN)
+        if len(segments) <= 1:
+            return self._synthesize_segment(text, dtype)
+        
+        # map keeps the sentences in order regardless of which finishes first
+        results = list(self._pool.map(lambda segment: self._synthesize_segment(segment, dtype), segments))
+        if not all(results):
+            return None
+        return (TTS_SAMPLE_RATE, np.concatenate([audio for _, audio in results], axis=1))
+    
+    def _synthesize_segment(self, text: str, dtype) -> Optional[Tuple[int, np.ndarray]]:
+        """Render one utterance with a single say process"""
         try:
-            with tempfile.NamedTemporaryFile(suffix='.aiff', delete=False) as tts_file:
-                logger.debug(f"🔊 Generating TTS: {text[:50]}...")
-                
-                # Build say command with configurable parameters
-                cmd = [
-                    'say', 
-                    '-v', self.voice,
-                    '-r', str(self.rate),
-                    '-o', tts_file.name,
-                    text
-                ]
-                
-                # Run say command with timeout
-                result = subprocess.run(
-                    cmd, 
-                    check=True, 
-                    capture_output=True,
-                    timeout=PERFORMANCE_CONFIG.tts_timeout
-                )
-                
-                # Convert AIFF to WAV at 24kHz
-                wav_file = tts_file.name.replace('.aiff', '.wav')
-                ffmpeg_cmd = [
-                    'ffmpeg', '-y', '-i', tts_file.name,
-                    '-ar', '24000', '-ac', '1', '-f', 'wav', wav_file
-                ]
-                
-                subprocess.run(
-                    ffmpeg_cmd, 
-                    check=True, 
-                    capture_output=True,
-                    timeout=PERFORMANCE_CONFIG.tts_timeout
-                )
-                
-                # Read the audio data
-                with wave.open(wav_file, 'rb') as audio_file:
-                    frames = audio_file.readframes(audio_file.getnframes())
-                    tts_audio = np.frombuffer(frames, dtype=np.int16)
-                
-                # Clean up temporary files
-                os.unlink(tts_file.name)
-                os.unlink(wav_file)
-                
-                # Apply volume scaling
-                if self.volume != 1.0:
-                    tts_audio = (tts_audio * self.volume).clip(-32768, 32767).astype(np.int16)
-                
-                audio_array = tts_audio.reshape(1, -1)
-                logger.debug(f"🔊 TTS generation completed: {len(tts_audio)} samples")
-                
-                return (24000, audio_array)
-                
+            logger.debug(f"🔊 Generating TTS: {text[:50]}...")
+            
+            proc = self._take_say_process()
+            try:
+                stdout, stderr = proc.communicate(text.encode('utf-8'), timeout=self._timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise
+            if proc.returncode != 0:
+                raise subprocess.CalledProcessError(proc.returncode, proc.args, stdout, stderr)
+            
+            sample_rate, tts_audio = wav_samples(stdout)
+            if sample_rate != TTS_SAMPLE_RATE:
+                # Normally say converts to the requested rate itself; this
+                # covers output that arrives at a voice's native rate instead
+                logger.debug(f"🔧 Resampling TTS audio: {sample_rate}Hz -> {TTS_SAMPLE_RATE}Hz")
+                tts_audio = resample_to_output_rate(tts_audio, sample_rate)
+            
+            if dtype == np.float32:
+                # Conversion to [-1, 1] and volume share one multiply, a single pass over the samples
+                tts_audio = np.multiply(tts_audio, np.float32(self.volume / 32768.0), dtype=np.float32)
+            elif self.volume != 1.0:
+                # Multiply, shift, clip and narrow to int16 in one compiled pass
+                tts_audio = scale_q15(tts_audio, self._volume_q15)
+            
+            # FastRTC takes (channels, samples); the channel axis is added as a
+            # view over contiguous samples, so it costs no copy
+            audio_array = np.expand_dims(np.ascontiguousarray(tts_audio), 0)
+            logger.debug(f"🔊 TTS generation completed: {len(tts_audio)} samples")
+            
+            return (TTS_SAMPLE_RATE, audio_array)
+            
         except subprocess.TimeoutExpired:
-            logger.error(f"❌ TTS generation timeout after {PERFORMANCE_CONFIG.tts_timeout}s")
+            logger.error(f"❌ TTS generation timeout after {self._timeout}s")
             return None
         except subprocess.CalledProcessError as e:
             logger.error(f"❌ TTS command failed: {e}")
@@ -108,47 +274,41 @@ class MacOSTTSProvider(BaseTTSProvider):
             logger.error(f"❌ TTS generation failed: {e}")
             return None
     
+    def synthesize_stream(self, text: str, *, dtype=np.int16) -> Iterator[Tuple[int, np.ndarray]]:
+        """Synthesize clause by clause, running say for the next clause while the current one is yielded"""
+        segments = split_segments(text)
+        if not segments:
+            return
+        
+        pending = self._prefetch_executor.submit(self._synthesize_segment, segments[0], dtype)
+        try:
+            for next_segment in segments[1:]:
+                result = pending.result()
+                pending = self._prefetch_executor.submit(self._synthesize_segment, next_segment, dtype)
+                if result:
+                    yield result
+            result = pending.result()
+            if result:
+                yield result
+        finally:
+            # Don't start a clause nobody will play if the consumer stops early
+            pending.cancel()
+    
+    def synthesize_batch(self, texts: List[str], *, dtype=np.int16) -> List[Optional[Tuple[int, np.ndarray]]]:
+        """Render several texts side by side, each in its own pre-started say process"""
+        return list(self._pool.map(lambda text: self._synthesize_segment(text, dtype), texts))
+    
     def get_available_voices(self) -> list:
         """Get list of available macOS voices"""
         try:
-            result = subprocess.run(
-                ['say', '-v', '?'], 
-                capture_output=True, 
-                text=True,
-                timeout=5
-            )
-            
-            voices = []
-            for line in result.stdout.strip().split('\n'):
-                if line.strip():
-                    # Parse voice name (format: "VoiceName    language    # description")
-                    parts = line.split('#')[0].strip().split()
-                    if parts:
-                        voice_name = parts[0]
-                        language = ' '.join(parts[1:]) if len(parts) > 1 else "unknown"
-                        voices.append({
-                            "name": voice_name,
-                            "language": language.strip(),
-                            "description": line.split('#')[1].strip() if '#' in line else ""
-                        })
-            
-            return voices
-            
+            return list_macos_voices()
         except Exception as e:
             logger.error(f"❌ Failed to get available voices: {e}")
             return []
     
     def is_available(self) -> bool:
         """Check if macOS say command is available"""
-        try:
-            result = subprocess.run(
-                ['which', 'say'], 
-                capture_output=True,
-                timeout=5
-            )
-            return result.returncode == 0
-        except:
-            return False
+        return self._available
 
 class TTSManager:
     """Unified TTS Manager"""
@@ -156,6 +316,10 @@ class TTSManager:
     def __init__(self):
         self.current_provider: Optional[BaseTTSProvider] = None
         self.provider_name = TTS_CONFIG.provider
+        # Recently synthesized utterances, least recently used first
+        self._cache: "OrderedDict[bytes, Tuple[int, np.ndarray]]" = OrderedDict()
+        self._cache_size = TTS_CONFIG.cache_size
+        self._cache_lock = threading.Lock()
         self._initialize_provider()
         
     def _initialize_provider(self):
@@ -177,35 +341,122 @@ class TTSManager:
             logger.error(f"❌ Failed to initialize TTS provider: {e}")
             self.current_provider = None
     
-    def synthesize(self, text: str) -> Optional[Tuple[int, np.ndarray]]:
-        """Synthesize text to speech"""
+    def synthesize(self, text: str, *, dtype=np.int16) -> Optional[Tuple[int, np.ndarray]]:
+        """Synthesize text to speech as int16 samples, or float32 in [-1, 1] with dtype=np.float32"""
         if not self.current_provider:
             logger.error("❌ No TTS provider available")
             return None
         
-        if not text or not text.strip():
+        stripped = text.strip() if text else ""
+        if not stripped:
             logger.warning("⚠️ Empty text provided for TTS")
             return None
         
-        start_time = time.time()
+        start_time = time.perf_counter()
+        
+        key = self._cache_key(stripped, dtype)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+        if cached is not None:
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"✅ TTS served from cache: {text[:30]}...")
+            return cached
         
         try:
-            result = self.current_provider.synthesize(text.strip())
+            result = self.current_provider.synthesize(stripped, dtype=dtype)
             
             if result:
-                duration = time.time() - start_time
-                sample_rate, audio_data = result
-                logger.info(f"✅ TTS completed in {duration:.2f}s: {text[:30]}...")
+                if logger.isEnabledFor(logging.INFO):
+                    duration = time.perf_counter() - start_time
+                    logger.info(f"✅ TTS completed in {duration:.2f}s: {text[:30]}...")
+                self._cache_put(key, result)
                 return result
             else:
                 logger.error("❌ TTS synthesis failed")
                 return None
                 
         except Exception as e:
-            duration = time.time() - start_time
+            duration = time.perf_counter() - start_time
             logger.error(f"❌ TTS synthesis error after {duration:.2f}s: {e}")
             return None
     
+    def _cache_key(self, text: str, dtype) -> bytes:
+        """Key an utterance by everything that changes the synthesized audio"""
+        return _digest(f"{TTS_CONFIG.voice}|{TTS_CONFIG.rate}|{TTS_CONFIG.volume}|{np.dtype(dtype).str}|{text}".encode())
+    
+    def _cache_put(self, key: bytes, result: Tuple[int, np.ndarray]):
+        """Store a synthesis result, evicting the least recently used ones past capacity"""
+        if self._cache_size <= 0:
+            return
+        
+        # Cached audio is shared between callers, so it must not be modified in place
+        result[1].setflags(write=False)
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+    
+    def synthesize_stream(self, text: str, *, dtype=np.int16) -> Iterator[Tuple[int, np.ndarray]]:
+        """Synthesize text to speech, yielding audio clause by clause so playback can start early"""
+        if not self.current_provider:
+            logger.error("❌ No TTS provider available")
+            return
+        
+        stripped = text.strip() if text else ""
+        if not stripped:
+            logger.warning("⚠️ Empty text provided for TTS")
+            return
+        
+        start_time = time.perf_counter()
+        first_chunk = True
+        for result in self.current_provider.synthesize_stream(stripped, dtype=dtype):
+            if first_chunk:
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info(f"✅ TTS first clause ready in {time.perf_counter() - start_time:.2f}s: {text[:30]}...")
+                first_chunk = False
+            yield result
+    
+    def synthesize_batch(self, texts: List[str], *, dtype=np.int16) -> List[Optional[Tuple[int, np.ndarray]]]:
+        """Synthesize several texts at once, returning one result (or None) per text in order"""
+        if not self.current_provider:
+            logger.error("❌ No TTS provider available")
+            return [None] * len(texts)
+        
+        results: List[Optional[Tuple[int, np.ndarray]]] = [None] * len(texts)
+        misses = []
+        for index, text in enumerate(texts):
+            stripped = text.strip() if text else ""
+            if not stripped:
+                continue
+            key = self._cache_key(stripped, dtype)
+            with self._cache_lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+            if cached is not None:
+                results[index] = cached
+            else:
+                misses.append((index, key, stripped))
+        
+        if misses:
+            start_time = time.perf_counter()
+            try:
+                rendered = self.current_provider.synthesize_batch([text for _, _, text in misses], dtype=dtype)
+            except Exception as e:
+                logger.error(f"❌ TTS batch synthesis error after {time.perf_counter() - start_time:.2f}s: {e}")
+                return results
+            for (index, key, _), result in zip(misses, rendered):
+                if result:
+                    self._cache_put(key, result)
+                    results[index] = result
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(f"✅ TTS batch of {len(misses)} completed in {time.perf_counter() - start_time:.2f}s")
+        
+        return results
+    
     def is_available(self) -> bool:
         """Check if TTS is available"""
         return self.current_provider is not None and self.current_provider.is_available()